@@ -1,18 +1,136 @@
 # -*- coding: utf-8 -*-
 
+import os
 import time
-import copy
 import re
+import json
+import uuid
+import hashlib
 import logging
 import requests
 import math
+import functools
 import html
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 import ndexindraloader
 from .exceptions import NDExIndraLoaderError
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
 
 logger = logging.getLogger(__name__)
 
+MEMBER_ATTRIB = 'member'
+"""
+Node attribute listing members of a protein family node
+"""
+
+
+def json_loads(data):
+    """
+    Parses JSON document in **data** using :py:mod:`orjson`
+    which is considerably faster then :py:mod:`json` on large
+    documents. If :py:mod:`orjson` is not installed
+    :py:func:`json.loads` is used instead.
+
+    :param data: JSON document to parse
+    :type data: bytes or str
+    :return: parsed JSON
+    :rtype: dict or list
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    if isinstance(data, bytes):
+        data = data.decode('utf-8')
+    return json.loads(data)
+
+
+def json_dumps(obj):
+    """
+    Serializes **obj** to JSON using :py:mod:`orjson` if installed
+    otherwise :py:func:`json.dumps` is used
+
+    :param obj: object to serialize
+    :type obj: dict or list
+    :return: JSON document encoded as utf-8
+    :rtype: bytes
+    """
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode('utf-8')
+
+
+def write_file_atomically(path, data):
+    """
+    Writes **data** to **path** by first writing to a temporary file
+    in the same directory and then renaming it to **path**. This way
+    a reader never sees a partially written file even if this
+    process is killed mid write
+
+    :param path: Path to write
+    :type path: str
+    :param data: Data to write
+    :type data: bytes
+    :return: None
+    """
+    tmp_path = path + '.' + str(uuid.uuid4()) + '.tmp'
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.isfile(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def load_json_cache_file(path):
+    """
+    Loads JSON from cache file **path**. If the file cannot be
+    parsed, most likely cause it was truncated, it is deleted
+    so the result is regenerated and ``None`` is returned
+
+    :param path: Path to cache file
+    :type path: str
+    :return: parsed JSON or ``None`` if file is not valid JSON
+    :rtype: dict or list
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    try:
+        return json_loads(data)
+    except ValueError as e:
+        logger.warning('Removing invalid cache file ' + path +
+                       ' : ' + str(e))
+        os.remove(path)
+    return None
+
+
+def _family_members(net_cx=None, node_id=None):
+    """
+    Gets raw value of :py:const:`MEMBER_ATTRIB` node attribute for node with id
+    **node_id**
+
+    :param net_cx:
+    :type net_cx: :py:class:`~ndex2.nice_cx_network.NiceCXNetwork`
+    :param node_id: id of node
+    :type node_id: int
+    :return: list of members or ``None`` if attribute is missing or
+             is not a list
+    :rtype: list
+    """
+    # get_node_attribute() returns None or (None, None) if
+    # attribute is missing depending on version of ndex2
+    n_attr = net_cx.get_node_attribute(node_id, MEMBER_ATTRIB)
+    m_list = n_attr.get('v') if isinstance(n_attr, dict) else None
+    return m_list if isinstance(m_list, list) else None
+
 
 def get_members_of_family_node(net_cx=None, node_id=None):
     """
@@ -26,25 +144,13 @@ def get_members_of_family_node(net_cx=None, node_id=None):
     :return: (list of node names, list of any issues encountered)
     :rtype: tuple
     """
+    m_list = _family_members(net_cx=net_cx, node_id=node_id)
+    if not m_list:
+        return []
     hgncprefix = 'hgnc.symbol:'
     hgncprefix_len = len(hgncprefix)
-    member_name = 'member'
-    n_attr = net_cx.get_node_attribute(node_id,
-                                       member_name)
-    if n_attr is None or n_attr == (None, None):
-        return []
-    m_list = n_attr['v']
-    if not isinstance(m_list, list):
-        return []
-    node_names = []
-
-    for entry in m_list:
-        if entry.startswith(hgncprefix):
-            name_only = entry[hgncprefix_len:]
-        else:
-            name_only = entry
-        node_names.append(name_only)
-    return node_names
+    return [entry[hgncprefix_len:] if entry.startswith(hgncprefix)
+            else entry for entry in m_list]
 
 
 def get_node_name_to_id_dict(net_cx=None):
@@ -55,15 +161,12 @@ def get_node_name_to_id_dict(net_cx=None):
     :return:
     :rtype: dict
     """
-    node_dict = {}
-    for node_id, node_obj in net_cx.get_nodes():
-        node_members = get_members_of_family_node(net_cx=net_cx,
-                                                  node_id=node_id)
-        if len(node_members) > 0:
-            for n in node_members:
-                node_dict[n] = node_id
-        node_dict[node_obj['n']] = node_id
-    return node_dict
+    # node name is listed after family members so it takes
+    # precedence if a member has the same name
+    return {name: node_id
+            for node_id, node_obj in net_cx.get_nodes()
+            for name in get_members_of_family_node(net_cx=net_cx,
+                                                   node_id=node_id) + [node_obj['n']]}
 
 
 def is_family_node(net_cx=None, node_id=None):
@@ -74,17 +177,7 @@ def is_family_node(net_cx=None, node_id=None):
     :param node_id:
     :return:
     """
-    member_name = 'member'
-    n_attr = net_cx.get_node_attribute(node_id,
-                                       member_name)
-    if n_attr is None or n_attr == (None, None):
-        return False
-    m_list = n_attr['v']
-    if not isinstance(m_list, list):
-        return False
-    if len(m_list) > 0:
-        return True
-    return False
+    return bool(_family_members(net_cx=net_cx, node_id=node_id))
 
 
 def get_node_id_to_name_dict(net_cx=None):
@@ -97,10 +190,7 @@ def get_node_id_to_name_dict(net_cx=None):
     :return: map of node id to node names
     :rtype: dict
     """
-    node_dict = {}
-    for node_id, node_obj in net_cx.get_nodes():
-        node_dict[node_id] = node_obj['n']
-    return node_dict
+    return {node_id: node_obj['n'] for node_id, node_obj in net_cx.get_nodes()}
 
 
 def remove_edge(net_cx=None, edge_id=None):
@@ -112,13 +202,12 @@ def remove_edge(net_cx=None, edge_id=None):
     :param edge_id:
     :return:
     """
-    e_attr_names = set()
     e_attribs = net_cx.get_edge_attributes(edge_id)
     if e_attribs is not None:
-        for edge_attr in e_attribs:
-            e_attr_names.add(edge_attr['n'])
-    for e_attr in e_attr_names:
-        net_cx.remove_edge_attribute(edge_id, e_attr)
+        # remove_edge_attribute() removes entries from the very
+        # list we are iterating over so iterate over a snapshot
+        for edge_attr in list(e_attribs):
+            net_cx.remove_edge_attribute(edge_id, edge_attr['n'])
     net_cx.remove_edge(edge_id)
 
 
@@ -141,16 +230,40 @@ class StatementFilter(object):
 
     def filter(self, edge_evidence):
         """
-        Subclasses should implement
+        Subclasses should implement. Implementations must not
+        modify **edge_evidence**
 
         :param edge_evidence:
         :type edge_evidence: dict
-        :return: Copy of edge_evidence with filtered statements removed and str report
-                 in a tuple (evidence, report)
+        :return: edge_evidence with filtered statements removed and str report
+                 in a tuple (evidence, report). If no statements were removed
+                 edge_evidence may be returned as is
         :rtype: tuple
         """
         raise NotImplementedError('subclasses should implement')
 
+    def _remove_statements(self, edge_evidence, stmts_to_remove):
+        """
+        Gets **edge_evidence** without the statements whose keys
+        are in **stmts_to_remove**. **edge_evidence** is not modified
+
+        :param edge_evidence:
+        :type edge_evidence: dict
+        :param stmts_to_remove: keys of statements to remove
+        :type stmts_to_remove: set
+        :return: **edge_evidence** if **stmts_to_remove** is empty
+                 otherwise shallow copy of **edge_evidence** with
+                 a new ``stmts`` dict holding the remaining statements
+        :rtype: dict
+        """
+        if not stmts_to_remove:
+            return edge_evidence
+        filtered_e = dict(edge_evidence)
+        filtered_e['stmts'] = {stmtkey: stmt for stmtkey, stmt
+                               in edge_evidence['stmts'].items()
+                               if stmtkey not in stmts_to_remove}
+        return filtered_e
+
 
 class SparserComplexStatementFilter(StatementFilter):
     """
@@ -187,33 +300,24 @@ class SparserComplexStatementFilter(StatementFilter):
         :param edge_evidence:
         :return:
         """
-        filtered_e = copy.deepcopy(edge_evidence)
         report = ''
         stmts_to_remove = set()
-        for stmtkey in filtered_e['stmts'].keys():
-            stmt = filtered_e['stmts'][stmtkey]
+        for stmtkey, stmt in edge_evidence['stmts'].items():
             # we only filter if type is Complex
             if stmt['stmt_type'] != 'Complex':
                 continue
 
-            # we have more then one source, no filtering
-            # needed
-            if len(stmt['source_counts'].keys()) > 1:
-                continue
-
-            source = list(stmt['source_counts'].keys())[0]
-            # if the source is sparser regardless of evidence
+            # if the only source is sparser regardless of evidence
             # count, toss it
-            if source == 'sparser':
+            source_counts = stmt['source_counts']
+            if len(source_counts) == 1 and 'sparser' in source_counts:
                 stmts_to_remove.add(stmtkey)
 
-        for stmtkey in stmts_to_remove:
-            del filtered_e['stmts'][stmtkey]
         removed_cnt = len(stmts_to_remove)
 
         if removed_cnt > 0:
             report += 'Removed ' + str(removed_cnt) + ' sparser complex statements\n'
-        return filtered_e, report
+        return self._remove_statements(edge_evidence, stmts_to_remove), report
 
 
 class MedscanStatementFilter(StatementFilter):
@@ -250,25 +354,17 @@ class MedscanStatementFilter(StatementFilter):
         :param edge_evidence:
         :return:
         """
-        filtered_e = copy.deepcopy(edge_evidence)
         report = ''
         stmts_to_remove = set()
-        for stmtkey in filtered_e['stmts'].keys():
-            stmt = filtered_e['stmts'][stmtkey]
+        for stmtkey, stmt in edge_evidence['stmts'].items():
+            source_counts = stmt['source_counts']
 
-            # we have more then one source, no filtering
-            # needed
-            if len(stmt['source_counts'].keys()) > 1:
-                continue
-
-            source = list(stmt['source_counts'].keys())[0]
-            # if the source is sparser regardless of evidence
+            # if the only source is medscan regardless of evidence
             # count, toss it
-            if source == 'medscan':
+            if len(source_counts) == 1 and 'medscan' in source_counts:
                 stmts_to_remove.add(stmtkey)
 
-        for stmtkey in stmts_to_remove:
-            del filtered_e['stmts'][stmtkey]
+        filtered_e = self._remove_statements(edge_evidence, stmts_to_remove)
         removed_cnt = len(stmts_to_remove)
 
         if removed_cnt > 0:
@@ -286,6 +382,13 @@ class SingleReadingStatementFilter(StatementFilter):
     system, the precision is in the 75-80% range.
 
     """
+
+    READING_SOURCES = frozenset(['eidos', 'trips', 'reach', 'sparser',
+                                 'medscan', 'rlimsp', 'isi'])
+    """
+    Sources of evidence that are reading systems
+    """
+
     def __init__(self):
         """
         Constructor
@@ -313,31 +416,26 @@ class SingleReadingStatementFilter(StatementFilter):
         :param edge_evidence:
         :return:
         """
-        filtered_e = copy.deepcopy(edge_evidence)
         report = ''
         stmts_to_remove = set()
-        for stmtkey in filtered_e['stmts'].keys():
-            stmt = filtered_e['stmts'][stmtkey]
+        for stmtkey, stmt in edge_evidence['stmts'].items():
             # we have more then one source we are good
             if len(stmt['source_counts'].keys()) > 1:
                 continue
 
-            source = list(stmt['source_counts'].keys())[0]
+            source = next(iter(stmt['source_counts']), None)
             # if the source is a reading source and only 1 piece
             # of evidence. Toss it
-            if source in ['eidos', 'trips', 'reach', 'sparser',
-                          'medscan', 'rlimsp', 'isi']:
+            if source in SingleReadingStatementFilter.READING_SOURCES:
                 if stmt['source_counts'][source] <= 1:
                     stmts_to_remove.add(stmtkey)
 
-        for stmtkey in stmts_to_remove:
-            del filtered_e['stmts'][stmtkey]
         removed_cnt = len(stmts_to_remove)
 
         if removed_cnt > 0:
             report += 'Removed ' + str(removed_cnt) +\
                       ' statements with only single reading system source\n'
-        return filtered_e, report
+        return self._remove_statements(edge_evidence, stmts_to_remove), report
 
 
 class IncorrectStatementFilter(StatementFilter):
@@ -399,6 +497,12 @@ class IncorrectStatementFilter(StatementFilter):
         incorrect curations, it is overall correct and should be kept
         All other statements can be kept
     """
+
+    GOOD_TAGS = frozenset(['correct', 'hypothesis', 'act_vs_amt'])
+    """
+    Curation tags that denote a statement is correct
+    """
+
     def __init__(self, curationlist=None):
         """
         Constructor
@@ -407,13 +511,16 @@ class IncorrectStatementFilter(StatementFilter):
         :type list:
         """
         super(StatementFilter, self).__init__()
-        self._curations = {}
+        self._curations = defaultdict(list)
         if curationlist is not None:
             for entry in curationlist:
-                pa_hash = entry['pa_hash']
-                if pa_hash not in self._curations:
-                    self._curations[pa_hash] = []
-                self._curations[pa_hash].append(entry)
+                self._curations[entry['pa_hash']].append(entry)
+
+        # hashes of statements that have curations, none of them good
+        self._incorrect_hashes = set()
+        for pa_hash, curations in self._curations.items():
+            if self._is_at_least_one_curation_correct(curations=curations) is False:
+                self._incorrect_hashes.add(pa_hash)
 
     def get_description(self):
         """
@@ -435,10 +542,8 @@ class IncorrectStatementFilter(StatementFilter):
         :param curations:
         :return:
         """
-        for curation in curations:
-            if curation['tag'] in ['correct', 'hypothesis', 'act_vs_amt']:
-                return True
-        return False
+        return any(curation['tag'] in IncorrectStatementFilter.GOOD_TAGS
+                   for curation in curations)
 
     def filter(self, edge_evidence):
         """
@@ -447,20 +552,13 @@ class IncorrectStatementFilter(StatementFilter):
         :param edge_evidence:
         :return:
         """
-        filtered_e = copy.deepcopy(edge_evidence)
         report = ''
         stmts_to_remove = set()
-        for stmtkey in filtered_e['stmts'].keys():
-            intstmtkey = int(stmtkey)
-            if intstmtkey not in self._curations:
-                continue
-            curations = self._curations[intstmtkey]
-            if self._is_at_least_one_curation_correct(curations=curations) is False:
+        for stmtkey in edge_evidence['stmts'].keys():
+            if int(stmtkey) in self._incorrect_hashes:
                 stmts_to_remove.add(stmtkey)
-                continue
 
-        for stmtkey in stmts_to_remove:
-            del filtered_e['stmts'][stmtkey]
+        filtered_e = self._remove_statements(edge_evidence, stmts_to_remove)
         removed_cnt = len(stmts_to_remove)
         if removed_cnt > 0:
             report += 'Removed ' + str(removed_cnt) + ' statements that lacked good curations\n'
@@ -473,6 +571,18 @@ class SelfLoopStatementFilter(StatementFilter):
     where source and target are the same
 
     """
+
+    TRAILING_PERIOD_RE = re.compile(r'\.$')
+    """
+    Matches period at end of english sentence of a statement
+    """
+
+    SELF_LOOP_RE = re.compile(r'\s*(\S+)\s+\S+\s+\1(?:\s|$)')
+    """
+    Matches english sentence of a statement whose first and
+    third words are the same ie ``foo binds foo``
+    """
+
     def __init__(self):
         """
         Constructor
@@ -504,32 +614,27 @@ class SelfLoopStatementFilter(StatementFilter):
         :param edge_evidence:
         :return:
         """
-        filtered_e = copy.deepcopy(edge_evidence)
         entity_name_set = set()
         report = ''
-        removed_cnt = 0
         stmts_to_remove = set()
         for entity in edge_evidence['edge']:
             entity_name_set.add(entity['name'])
 
         if len(entity_name_set) <= 1:
-            removed_cnt = len(filtered_e['stmts'])
-            filtered_e['stmts'] = {}
-
-        for stmtkey in filtered_e['stmts'].keys():
-            stmt = filtered_e['stmts'][stmtkey]
-            english_clean = re.sub('\.$', '', stmt['english'])
-            split_english = english_clean.split()
-            if split_english[0] == split_english[2]:
-                stmts_to_remove.add(stmtkey)
+            stmts_to_remove.update(edge_evidence['stmts'].keys())
+        else:
+            trailing_period_re = SelfLoopStatementFilter.TRAILING_PERIOD_RE
+            self_loop_re = SelfLoopStatementFilter.SELF_LOOP_RE
+            for stmtkey, stmt in edge_evidence['stmts'].items():
+                english_clean = trailing_period_re.sub('', stmt['english'],
+                                                       count=1)
+                if self_loop_re.match(english_clean) is not None:
+                    stmts_to_remove.add(stmtkey)
 
-        if len(stmts_to_remove) > 0:
-            for stmtkey in stmts_to_remove:
-                del filtered_e['stmts'][stmtkey]
-            removed_cnt = len(stmts_to_remove)
+        removed_cnt = len(stmts_to_remove)
         if removed_cnt > 0:
             report += 'Removed ' + str(removed_cnt) + ' self loop statements\n'
-        return filtered_e, report
+        return self._remove_statements(edge_evidence, stmts_to_remove), report
 
 
 class Indra(object):
@@ -554,6 +659,14 @@ class Indra(object):
     These statement types aka 'stmt_type' are non directional
     """
 
+    PARALLEL_MIN_EDGES = 2000
+    """
+    Minimum number of new edges needed to compute edge attributes
+    in separate processes when ``parallel=True`` is passed to
+    :py:meth:`annotate_network`. Below this starting the processes
+    costs more then is saved
+    """
+
     SOURCE = '__edge_source'
     """
     Name of edge attribute to denote source of edge
@@ -585,10 +698,20 @@ class Indra(object):
     Default target value set for html links
     """
 
+    # template for network description set by annotate_network(),
+    # {desc} is replaced with the original description
+    _DESC_TEMPLATE = '{desc}\n\n<b>Additional edges added by ' \
+                     'NDExIndraLoader (version: ' + \
+                     ndexindraloader.__version__ + \
+                     ')</b> using <a href="https://www.indra.bio" ' \
+                     'target="' + DEFAULT_BROWSER_TARGET + \
+                     '">INDRA service</a><br/>'
+
     def __init__(self, subgraph_endpoint=None,
                  timeout=600,
                  default_browser_target=DEFAULT_BROWSER_TARGET,
-                 stmtfilters=None):
+                 stmtfilters=None,
+                 cache_dir=None):
         """
         Constructor
 
@@ -602,6 +725,12 @@ class Indra(object):
                                        See https://www.w3schools.com/tags/att_a_target.asp
                                        for more information
         :type default_browser_target: str
+        :param cache_dir: If set, responses from INDRA service are saved
+                          in this directory and reused for subsequent
+                          queries with the same set of node names.
+                          Not used by ``ndexloadindra.py`` which caches
+                          results per network in ``--indracachedir``
+        :type cache_dir: str
         """
         self._timeout = timeout
         self._subgraph_endpoint = Indra.SUBGRAPH_ENDPOINT
@@ -615,35 +744,78 @@ class Indra(object):
             self._subgraph_endpoint = subgraph_endpoint
 
         self._stmtfilters = stmtfilters
+        self._cache_dir = cache_dir
 
+    def _get_cache_file(self, n_dict=None):
+        """
+        Gets path to file in cache directory for INDRA query **n_dict**.
+        The file name is the SHA1 of the sorted unique node names in
+        the query so the same set of nodes maps to the same file
+        regardless of order or duplicate names.
+
+        :param n_dict: INDRA query as returned by
+                       :py:meth:`_get_indra_query_dict`
+        :type n_dict: dict
+        :return: path to cache file, which may not exist
+        :rtype: str
+        """
+        names = sorted(set(n['name'] for n in n_dict['nodes']))
+        key = hashlib.sha1(json.dumps(names).encode('utf-8')).hexdigest()
+        return os.path.join(self._cache_dir, key + '.json')
 
-    def _get_indra_result(self, net_cx=None, indraresult=None):
+    def _get_indra_result(self, net_cx=None, indraresult=None,
+                          use_cache=True):
         """
         Queries INDRA REST service with given network unless
         **indraresult** is not ``None`` in which case that is returned
 
+        If cache directory was set in constructor and **use_cache** is
+        ``True`` a previously saved response for the same set of node
+        names is returned instead of querying the service. Responses
+        from the service are saved to the cache directory.
+
         :param net_cx: Network to use for query
         :type net_cx: :py:class:`~ndex2.nice_cx_network.NiceCXNetwork`
         :param indraresult: Way to pass in cached result that is
                             used in leiu of querying the INDRA service.
         :type indraresult: dict
+        :param use_cache: If ``False`` cache directory is ignored
+        :type use_cache: bool
         :return: Value of **indraresult** if not ``None`` otherwise
                  response from querying INDRA service
         :rtype: dict
         """
         if indraresult is not None:
             return indraresult, 0
-        resp, elapsed_time = self.query_indra(net_cx=net_cx)
+
+        n_dict = None
+        cache_file = None
+        if use_cache is True and self._cache_dir is not None:
+            n_dict = self._get_indra_query_dict(net_cx=net_cx)
+            cache_file = self._get_cache_file(n_dict=n_dict)
+            if os.path.isfile(cache_file):
+                res = load_json_cache_file(cache_file)
+                if res is not None:
+                    logger.info('Using cached INDRA result: ' + cache_file)
+                    return res, 0
+
+        resp, elapsed_time = self.query_indra(net_cx=net_cx, n_dict=n_dict)
         if resp.status_code != 200:
             raise NDExIndraLoaderError('Caught non 200 http code from '
                                        'query : ' + str(resp.status_code) +
                                        ' : ' + str(resp.text))
         try:
-            return resp.json(), elapsed_time
+            res = json_loads(resp.content)
         except Exception as e:
             raise NDExIndraLoaderError('Caught Exception attempting to parse json from '
                                        'query ' + str(e))
 
+        if cache_file is not None:
+            logger.debug('Saving INDRA result to: ' + cache_file)
+            # response body is already json so write it as is
+            write_file_atomically(cache_file, resp.content)
+        return res, elapsed_time
+
     def _add_source_to_existing_edges(self, net_cx=None, source_value=None):
         """
         Adds source value if flag is set
@@ -654,10 +826,19 @@ class Indra(object):
         """
         if source_value is None:
             return
+        # update edge attributes aspect directly, going through
+        # get/set_edge_attribute() for every edge is much slower
+        edge_attrs = net_cx.edgeAttributes
         for edge_id, edge_obj in net_cx.get_edges():
-            e_attr = net_cx.get_edge_attribute(edge_id, Indra.SOURCE)
-            if e_attr == (None, None):
-                net_cx.set_edge_attribute(edge_id, Indra.SOURCE, source_value)
+            e_attrs = edge_attrs.get(edge_id)
+            if e_attrs is None:
+                edge_attrs[edge_id] = [{'po': edge_id,
+                                        'n': Indra.SOURCE,
+                                        'v': source_value}]
+            elif not any(a['n'] == Indra.SOURCE for a in e_attrs):
+                e_attrs.append({'po': edge_id,
+                                'n': Indra.SOURCE,
+                                'v': source_value})
 
     def _remove_original_edges(self, net_cx=None, remove_orig_edges=None):
         """
@@ -675,12 +856,11 @@ class Indra(object):
             return
         logger.info('Removing original edges')
 
-        edges_to_remove = []
-        for edge_id, edge_obj in net_cx.get_edges():
-            edges_to_remove.append(edge_id)
-        for e in edges_to_remove:
-            remove_edge(net_cx=net_cx, edge_id=e)
-        del edges_to_remove
+        # every edge is going so empty the edges and edge
+        # attributes in one shot instead of calling remove_edge()
+        # for each edge
+        net_cx.edges.clear()
+        net_cx.edgeAttributes.clear()
 
     def _filter_statements(self, edge_evidence=None):
         """
@@ -765,7 +945,10 @@ class Indra(object):
     def annotate_network(self, net_cx=None, indraresult=None,
                          netprefix='INDRA annotated - ',
                          remove_orig_edges=False,
-                         source_value=None):
+                         source_value=None,
+                         parallel=False,
+                         max_workers=None,
+                         use_cache=True):
         """
 
         :param net_cx:
@@ -775,21 +958,45 @@ class Indra(object):
         :param min_evidence_cnt:
         :param keep_self_edges:
         :param source_value:
+        :param parallel: If ``True`` attributes for the new edges are
+                         computed in separate processes via
+                         :py:class:`concurrent.futures.ProcessPoolExecutor`
+                         which can help on networks with many edges.
+                         Ignored if there are fewer then
+                         :py:const:`PARALLEL_MIN_EDGES` new edges
+        :type parallel: bool
+        :param max_workers: Number of processes to use if **parallel** is
+                            ``True``. If ``None`` number of processors
+                            on the machine is used
+        :type max_workers: int
+        :param use_cache: If ``False`` cache directory passed into
+                          constructor is ignored
+        :type use_cache: bool
         :return:
         """
         result, elapsed_time = self._get_indra_result(net_cx=net_cx,
-                                                      indraresult=indraresult)
+                                                      indraresult=indraresult,
+                                                      use_cache=use_cache)
 
-        stmt_hash = {}
+        node_name_to_id_dict = get_node_name_to_id_dict(net_cx=net_cx)
+
+        stmt_hash = defaultdict(list)
+
+        # building the debug messages below is expensive so
+        # only do so if they will actually be logged
+        debug_enabled = logger.isEnabledFor(logging.DEBUG)
 
         self._remove_original_edges(net_cx=net_cx,
                                     remove_orig_edges=remove_orig_edges)
 
-        node_name_to_id_dict = get_node_name_to_id_dict(net_cx=net_cx)
-
         for raw_edge_evidence in result['edges']:
             edge_evidence = self._filter_statements(raw_edge_evidence)
 
+            # filters can remove every statement from an edge in which
+            # case there is nothing to add so skip the lookups below
+            if len(edge_evidence['stmts']) == 0:
+                continue
+
             src_name = edge_evidence['edge'][0]['name']
             target_name = edge_evidence['edge'][1]['name']
 
@@ -801,36 +1008,68 @@ class Indra(object):
             src_node_id = node_name_to_id_dict[src_name]
             target_node_id = node_name_to_id_dict[target_name]
 
+            # key only depends on the node ids so compute it once per edge
+            src_tar_key, \
+            isreveresed = self._get_source_target_key(src_node_id=src_node_id,
+                                                      target_node_id=target_node_id)
+
+            stmt_list = stmt_hash[src_tar_key]
             for stmtkey in edge_evidence['stmts'].keys():
-                stmt = edge_evidence['stmts'][stmtkey]
+                # filters can return statements from the INDRA result
+                # as is so copy before adding to them, otherwise
+                # caller's result would be modified
+                stmt = dict(edge_evidence['stmts'][stmtkey])
                 stmt['source_node'] = src_name
                 stmt['source_node_id'] = src_node_id
                 stmt['target_node'] = target_name
                 stmt['target_node_id'] = target_node_id
 
-                logger.debug(stmtkey + ' > ' + src_name +
-                             ' => ' + target_name + ' ---> ' + str(stmt))
-                src_tar_key, \
-                isreveresed = self._get_source_target_key(src_node_id=src_node_id,
-                                                          target_node_id=target_node_id)
+                if debug_enabled:
+                    logger.debug(stmtkey + ' > ' + src_name +
+                                 ' => ' + target_name + ' ---> ' + str(stmt))
                 stmt['isreversed'] = isreveresed
-                if src_tar_key not in stmt_hash:
-                    stmt_hash[src_tar_key] = []
-                stmt_hash[src_tar_key].append(stmt)
-
-        for key in stmt_hash.keys():
-            logger.debug(key + ' # of statements: ' + str(len(stmt_hash[key])))
-            for stmt in stmt_hash[key]:
-                logger.debug(stmt['stmt_type'] + ' (' + stmt['english'] +
-                             ') belief=' + str(stmt['belief']) +
-                             ' hash=' + str(stmt['stmt_hash']))
+                stmt_list.append(stmt)
+
+        if debug_enabled:
+            for key in stmt_hash.keys():
+                logger.debug(key + ' # of statements: ' + str(len(stmt_hash[key])))
+                for stmt in stmt_hash[key]:
+                    logger.debug(stmt['stmt_type'] + ' (' + stmt['english'] +
+                                 ') belief=' + str(stmt['belief']) +
+                                 ' hash=' + str(stmt['stmt_hash']))
+
+        edge_keys = list(stmt_hash.keys())
+        stmt_lists = [stmt_hash[key] for key in edge_keys]
+        if parallel is True and len(stmt_lists) >= Indra.PARALLEL_MIN_EDGES:
+            if max_workers is None:
+                num_workers = os.cpu_count() or 1
+            else:
+                num_workers = max_workers
+            # send edges to workers in a few large chunks, and pass only
+            # the browser target rather then this object, to keep
+            # pickling cost below the cost of computing the payloads.
+            # map() returns results in order so edge ids match what
+            # the serial path would generate
+            chunksize = max(1, len(stmt_lists) // (num_workers * 4))
+            get_payload = functools.partial(_get_edge_payload,
+                                            browser_target=self._browser_target)
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                payloads = list(executor.map(get_payload, stmt_lists,
+                                             chunksize=chunksize))
+        else:
+            payloads = map(self._get_edge_payload, stmt_lists)
+
+        # collect attributes of new edges and add them to
+        # the network in one update once all edges are created
+        new_edge_attributes = {}
+        for key, payload in zip(edge_keys, payloads):
             split_key = key.split('_')
-            s_node_id = int(split_key[0])
-            t_node_id = int(split_key[1])
-            self._single_edge_adder(net_cx=net_cx,
-                                    src_node_id=s_node_id,
-                                    target_node_id=t_node_id,
-                                    stmt_list=stmt_hash[key])
+            self._add_edge_with_payload(net_cx=net_cx,
+                                        src_node_id=int(split_key[0]),
+                                        target_node_id=int(split_key[1]),
+                                        payload=payload,
+                                        edge_attributes=new_edge_attributes)
+        net_cx.edgeAttributes.update(new_edge_attributes)
 
         net_cx.set_network_attribute('__INDRA query time in seconds',
                                      values=str(elapsed_time))
@@ -844,15 +1083,7 @@ class Indra(object):
         param_str = {'Remove Original Edges': remove_orig_edges}
 
         net_cx.set_network_attribute('description',
-                                     values=str(desc) +
-                                     '\n\n<b>Additional edges added by ' +
-                                     'NDExIndraLoader (version: ' +
-                                     ndexindraloader.__version__ +
-                                     ')</b> using <a href="https://www.' +
-                                     'indra.bio" target="' +
-                                     Indra.DEFAULT_BROWSER_TARGET +
-                                     '">INDRA ' +
-                                     'service</a><br/>')
+                                     values=Indra._DESC_TEMPLATE.format(desc=desc))
 
         net_cx.set_network_attribute('INDRA parameters', values=param_str)
         net_cx.set_name(netprefix + net_cx.get_name())
@@ -861,17 +1092,20 @@ class Indra(object):
 
         return net_cx, result
 
-    def query_indra(self, net_cx=None):
+    def query_indra(self, net_cx=None, n_dict=None):
         """
         Queries indra subgraph endpoint
 
         :param net_cx: network used to build query for INDRA
         :type net_cx: :py:class:`~ndex2.nice_cx_network.NiceCXNetwork`
-        :param subgraph_endpoint:
+        :param n_dict: Query to send, if ``None`` query is built from
+                       **net_cx** with :py:meth:`_get_indra_query_dict`
+        :type n_dict: dict
         :return: (requests.Response, Request duration in seconds)
         :rtype: tuple
         """
-        n_dict = self._get_indra_query_dict(net_cx=net_cx)
+        if n_dict is None:
+            n_dict = self._get_indra_query_dict(net_cx=net_cx)
         if logger.isEnabledFor(logging.DEBUG):
             logger.debug(n_dict)
         start_time = int(time.time())
@@ -896,27 +1130,23 @@ class Indra(object):
               'lookup': ''}
             ]
 
+        Each node name is followed by the names of its family
+        members, if any.
+
         :param net_cx: Network to extract node names from
         :type net_cx: :py:class:`~ndex2.nice_cx_network.NiceCXNetwork`
         :return: dict in INDRA format denoted above.
         :rtype: dict
         """
-        n_dict = {'nodes': []}
+        names = []
         for node_id, node_obj in net_cx.get_nodes():
-            node_members = get_members_of_family_node(net_cx=net_cx,
-                                                      node_id=node_id)
-
-            n_dict['nodes'].append({'name': node_obj['n'],
-                                    'namespace': '0',
-                                    'identifier': '0',
-                                    'lookup': None})
-            if len(node_members) > 0:
-                for n in node_members:
-                    n_dict['nodes'].append({'name': n,
-                                            'namespace': '0',
-                                            'identifier': '0',
-                                            'lookup': None})
-        return n_dict
+            names.append(node_obj['n'])
+            names.extend(get_members_of_family_node(net_cx=net_cx,
+                                                    node_id=node_id))
+        return {'nodes': [{'name': name,
+                           'namespace': '0',
+                           'identifier': '0',
+                           'lookup': None} for name in names]}
 
     def _get_unique_statments(self, stmt_list=None):
         """
@@ -948,21 +1178,15 @@ class Indra(object):
         :return unique statements
         :rtype: list
         """
-        stmt_english_set = set()
-        stmt_english_dict = {}
+        stmt_english_dict = defaultdict(list)
         for stmt in stmt_list:
-            if stmt['english'] not in stmt_english_dict:
-                stmt_english_dict[stmt['english']] = []
             stmt_english_dict[stmt['english']].append(stmt)
 
         unique_stmt_list = []
-        for key in stmt_english_dict.keys():
-            stmt_list = stmt_english_dict[key]
-            total_evidence_count = 0
-            for stmt in stmt_list:
-                total_evidence_count += stmt['evidence_count']
-            stmt_list[0]['evidence_count'] = total_evidence_count
-            unique_stmt_list.append(stmt_list[0])
+        for group in stmt_english_dict.values():
+            first = group[0]
+            first['evidence_count'] = sum(stmt['evidence_count'] for stmt in group)
+            unique_stmt_list.append(first)
 
         return unique_stmt_list
 
@@ -1001,10 +1225,24 @@ class Indra(object):
         :return: Id of edge created
         :rtype: int
         """
-        edge_id = net_cx.create_edge(edge_source=src_node_id,
-                                     edge_target=target_node_id,
-                                     edge_interaction='interacts with')
+        return self._add_edge_with_payload(net_cx=net_cx,
+                                           src_node_id=src_node_id,
+                                           target_node_id=target_node_id,
+                                           payload=self._get_edge_payload(stmt_list))
+
+    def _get_edge_payload(self, stmt_list):
+        """
+        Computes the values of the edge attributes set by
+        :py:meth:`_single_edge_adder` from statements in **stmt_list**.
+        This method does not touch the network and can be run in a
+        separate process.
 
+        :param stmt_list: Statements which are `dict` objects
+        :type stmt_list: list
+        :return: (``Relationships`` value, ``__relationship_score`` value,
+                  ``__directed`` value, ``__reverse_directed`` value)
+        :rtype: tuple
+        """
         unique_byhash_stmt_list = self._get_unique_statments(stmt_list=stmt_list)
 
         self._remove_period_from_statements(stmt_list=unique_byhash_stmt_list)
@@ -1023,6 +1261,9 @@ class Indra(object):
                 else:
                     forward_count += 1
 
+            # a non numeric evidence_count raises ValueError here
+            evidence_cnt = int(stmt['evidence_count'])
+
             # add tuple containing statement and evidence count
             # which will be used to sort the list later
             full_list_tuple.append((stmt['english'] + '(' +
@@ -1030,14 +1271,8 @@ class Indra(object):
                                                                     thesubject=stmt['source_node'],
                                                                     theobject=stmt['target_node'],
                                                                     thetype=stmt['stmt_type']) +
-                                   ')', int(stmt['evidence_count'])))
-            try:
-                total_evidence_cnt += int(stmt['evidence_count'])
-            except ValueError as ve:
-                logger.warning('Expected a number for evidence_count in this '
-                               'statement, but got: ' +
-                               str(stmt['evidence_count']) +
-                               ' full statement: ' + str(stmt))
+                                   ')', evidence_cnt))
+            total_evidence_cnt += evidence_cnt
             # nodirection[inter_only].append((stmt['evidence_count'], stmt['db_url_hash']))
         all_url = self._create_indra_all_evidence_url(evidence_cnt=total_evidence_cnt,
                                                       theagent0=stmt['source_node'],
@@ -1046,33 +1281,63 @@ class Indra(object):
         # sort the list in descending order based on evidence count
         # element 1 of tuple
         full_list = self._sort_evidence_tuple_list(full_list_tuple)
-        net_cx.set_edge_attribute(edge_id, Indra.RELATIONSHIPS,
-                                  'All Evidences (' +
-                                  all_url + ')<ul><li/>' +
-                                  '<li/>'.join(full_list) + '</ul>',
-                                  type='string')
-
-        net_cx.set_edge_attribute(edge_id, Indra.SOURCE,
-                                  'INDRA')
-
-        net_cx.set_edge_attribute(edge_id, Indra.RELATIONSHIP_SCORE,
-                                  math.log(float(total_evidence_cnt)),
-                                  type='double')
-
-        directedval = False
+        relationships = 'All Evidences (' + all_url + ')<ul><li/>' +\
+                        '<li/>'.join(full_list) + '</ul>'
+        # log of 0 is undefined so use 0.0 as score
+        # if there is no evidence at all
+        if total_evidence_cnt > 0:
+            score = math.log(total_evidence_cnt)
+        else:
+            score = 0.0
+        return (relationships, score,
+                forward_count > 0, reverse_count > 0)
 
-        if forward_count > 0:
-            directedval = True
+    def _add_edge_with_payload(self, net_cx=None, src_node_id=None,
+                               target_node_id=None, payload=None,
+                               edge_attributes=None):
+        """
+        Adds edge between **src_node_id** and **target_node_id** to
+        **net_cx** setting attributes with values in **payload**
 
-        reversedirectedval = False
-        if reverse_count > 0:
-            reversedirectedval = True
+        :param net_cx: Network to update
+        :type net_cx: :py:class:`~ndex2.nice_cx_network.NiceCXNetwork`
+        :param src_node_id: Source Node Id
+        :type src_node_id: int
+        :param target_node_id: Target Node Id
+        :type target_node_id: int
+        :param payload: Attribute values as returned by
+                        :py:meth:`_get_edge_payload`
+        :type payload: tuple
+        :param edge_attributes: If set, attributes for new edge are
+                                put in this dict keyed by edge id
+                                instead of directly into **net_cx**.
+                                Caller is then responsible for adding
+                                them to ``net_cx.edgeAttributes``
+        :type edge_attributes: dict
+        :return: Id of edge created
+        :rtype: int
+        """
+        relationships, score, directedval, reversedirectedval = payload
+        edge_id = net_cx.create_edge(edge_source=src_node_id,
+                                     edge_target=target_node_id,
+                                     edge_interaction='interacts with')
 
-        net_cx.set_edge_attribute(edge_id, Indra.DIRECTED, directedval,
-                                  type='boolean')
-        net_cx.set_edge_attribute(edge_id, Indra.REVERSE_DIRECTED,
-                                  reversedirectedval,
-                                  type='boolean')
+        if edge_attributes is None:
+            edge_attributes = net_cx.edgeAttributes
+
+        # edge was just created and has no attributes so set them
+        # all at once instead of calling set_edge_attribute() which
+        # scans existing attributes on every call
+        edge_attributes[edge_id] = [
+            {'po': edge_id, 'n': Indra.RELATIONSHIPS,
+             'v': relationships, 'd': 'string'},
+            {'po': edge_id, 'n': Indra.SOURCE, 'v': 'INDRA'},
+            {'po': edge_id, 'n': Indra.RELATIONSHIP_SCORE,
+             'v': score, 'd': 'double'},
+            {'po': edge_id, 'n': Indra.DIRECTED, 'v': directedval,
+             'd': 'boolean'},
+            {'po': edge_id, 'n': Indra.REVERSE_DIRECTED,
+             'v': reversedirectedval, 'd': 'boolean'}]
         return edge_id
 
     def _sort_evidence_tuple_list(self, list_of_tuples):
@@ -1091,13 +1356,13 @@ class Indra(object):
         """
         # create a dict where protein is key and value is list of
         # statements with that protein at beginning
-        protein_dict = {}
+        protein_dict = defaultdict(list)
         for a_tuple in list_of_tuples:
             protein = re.sub(' .*', '', a_tuple[0])
-            if protein not in protein_dict:
-                protein_dict[protein] = []
             protein_dict[protein].append(a_tuple)
-        logger.debug('Protein dict: ' + str(protein_dict))
+        debug_enabled = logger.isEnabledFor(logging.DEBUG)
+        if debug_enabled:
+            logger.debug('Protein dict: ' + str(protein_dict))
 
         sorted_tuple_list = []
         # sort each group by evidence count and add to a new tuple
@@ -1118,11 +1383,13 @@ class Indra(object):
 
         # sort [(EVIDENCE COUNT, [STATEMENTS....])] by  EVIDENCE COUNT
         sorted_tuple_list.sort(key=lambda y: y[0], reverse=True)
-        logger.debug('sorted tuple list after sort: ' + str(sorted_tuple_list))
+        if debug_enabled:
+            logger.debug('sorted tuple list after sort: ' + str(sorted_tuple_list))
 
         # create list of lists of just statements ie [[STATEMENTS...]]
         list_o_list = [a_tuple[1] for a_tuple in sorted_tuple_list]
-        logger.debug('list_o_list: ' + str(list_o_list))
+        if debug_enabled:
+            logger.debug('list_o_list: ' + str(list_o_list))
 
         # Flatten list of lists into single list
         final_list = []
@@ -1175,7 +1442,8 @@ class Indra(object):
         :return:
         """
         the_list = []
-        logger.debug('url_dict: ' + str(url_dict))
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug('url_dict: ' + str(url_dict))
         sorted_keys = sorted(url_dict.keys())
         for key in sorted_keys:
             url_str = key + '('
@@ -1204,6 +1472,40 @@ class Indra(object):
         :return: (key of source target, ``True`` if target was put first)
         :rtype: tuple
         """
-        if src_node_id <= target_node_id:
-            return str(src_node_id) + '_' + str(target_node_id), False
-        return str(target_node_id) + '_' + str(src_node_id), True
+        isreversed = src_node_id > target_node_id
+        low_id, high_id = (target_node_id, src_node_id) if isreversed \
+            else (src_node_id, target_node_id)
+        return str(low_id) + '_' + str(high_id), isreversed
+
+
+@functools.lru_cache(maxsize=4)
+def _get_payload_indra(browser_target):
+    """
+    Gets :py:class:`Indra` object, created once per process, used by
+    :py:func:`_get_edge_payload` to build edge attributes
+
+    :param browser_target: Passed to :py:class:`Indra` constructor
+                           as **default_browser_target**
+    :type browser_target: str
+    :return: Indra object with no statement filters or cache
+    :rtype: :py:class:`Indra`
+    """
+    return Indra(default_browser_target=browser_target)
+
+
+def _get_edge_payload(stmt_list, browser_target=None):
+    """
+    Module level version of :py:meth:`Indra._get_edge_payload` for
+    :py:class:`concurrent.futures.ProcessPoolExecutor` so only
+    **stmt_list** and **browser_target** are sent to the worker
+    process instead of the whole :py:class:`Indra` object with its
+    statement filters
+
+    :param stmt_list: Statements which are `dict` objects
+    :type stmt_list: list
+    :param browser_target: Value for ``target`` attribute of html links
+    :type browser_target: str
+    :return: see :py:meth:`Indra._get_edge_payload`
+    :rtype: tuple
+    """
+    return _get_payload_indra(browser_target)._get_edge_payload(stmt_list)
@@ -7,22 +7,25 @@ import json
 import uuid
 import time
 import logging
+import threading
+import queue
+import functools
 import configparser
+from multiprocessing.dummy import Pool as ThreadPool
 from logging import config
 import requests
-from tqdm import tqdm
-import networkx as nx
 
-import ndex2
 
-from ndexutil.cytoscape import Py4CytoscapeWrapper
 from ndexutil.cytoscape import DEFAULT_CYREST_API
-from ndexutil.ndex import NDExExtraUtils
 
 from ndexutil.config import NDExUtilConfig
 import ndexindraloader
 from ndexindraloader.exceptions import NDExIndraLoaderError
 from ndexindraloader.indra import Indra
+from ndexindraloader.indra import json_loads
+from ndexindraloader.indra import json_dumps
+from ndexindraloader.indra import write_file_atomically
+from ndexindraloader.indra import load_json_cache_file
 from ndexindraloader.indra import SelfLoopStatementFilter
 from ndexindraloader.indra import IncorrectStatementFilter
 from ndexindraloader.indra import SingleReadingStatementFilter
@@ -115,10 +118,14 @@ def _parse_arguments(desc, args):
                         help='If set, adds source edge attribute with value'
                              'passed in to existing edges of network')
     parser.add_argument('--style',
-                        default=os.path.join(os.path.dirname(ndexindraloader.indra.__file__),
-                                             'style.cx'),
                         help='If CX file, then style from that file is '
-                             'applied to network.')
+                             'applied to network. If unset, style.cx '
+                             'file in this package is used')
+    parser.add_argument('--force_layout', action='store_true',
+                        help='If set, layout set via --layout is applied '
+                             'even if network already has a layout. By '
+                             'default networks with a layout are not '
+                             'laid out again')
     parser.add_argument('--tmpdir', default='.',
                         help='Temp directory used for Cytoscape layouts')
     parser.add_argument('--layout', default='cdqforcelayout',
@@ -146,6 +153,10 @@ def _parse_arguments(desc, args):
                         default=DEFAULT_CYREST_API,
                         help='URL of CyREST API. Default value '
                              'is default for locally running Cytoscape')
+    parser.add_argument('--jobs', type=int, default=1,
+                        help='Number of networks to process concurrently. '
+                             'Steps that use Cytoscape are still run one '
+                             'network at a time')
     parser.add_argument('--disable_tqdm', action='store_true',
                         help='If set, disables tqdm progress bars')
     parser.add_argument('--logconf', default=None,
@@ -197,8 +208,103 @@ def _setup_logging(args):
                               disable_existing_loggers=False)
 
 
+@functools.lru_cache(maxsize=32)
+def _load_config_cached(path, mtime):
+    """
+    Loads configuration file at **path**. Results are memoized
+    by path and modification time so a configuration file is only
+    parsed once unless it changes. Callers must not modify the
+    returned object
+
+    :param path: Absolute path to configuration file
+    :type path: str
+    :param mtime: Modification time of **path**, only used as
+                  part of the cache key
+    :type mtime: float
+    :return: parsed configuration
+    :rtype: :py:class:`configparser.ConfigParser`
+    """
+    return NDExUtilConfig(conf_file=path).get_config()
+
+
+def _load_cx_file(path):
+    """
+    Loads CX file at **path** as a network. The file is parsed
+    with :py:func:`~ndexindraloader.indra.json_loads` which is
+    faster then the builtin ``json`` module used by
+    :py:func:`ndex2.create_nice_cx_from_file`
+
+    :param path: Path to CX file
+    :type path: str
+    :return: network
+    :rtype: :py:class:`~ndex2.nice_cx_network.NiceCXNetwork`
+    """
+    import ndex2
+    with open(path, 'rb') as f:
+        return ndex2.create_nice_cx_from_raw_cx(json_loads(f.read()))
+
+
+@functools.lru_cache(maxsize=4)
+def _load_style_template_cached(path, mtime):
+    """
+    Loads CX file at **path** as a network. Results are memoized
+    by path and modification time so a style file is only parsed
+    once unless it changes
+
+    :param path: Absolute path to CX file
+    :type path: str
+    :param mtime: Modification time of **path**, only used as
+                  part of the cache key
+    :type mtime: float
+    :return: style network
+    :rtype: :py:class:`~ndex2.nice_cx_network.NiceCXNetwork`
+    """
+    return _load_cx_file(path)
+
+
+@functools.lru_cache(maxsize=4)
+def _load_curation_file_cached(path, mtime):
+    """
+    Loads curations JSON file at **path**. Results are memoized
+    by path and modification time so a curations file is only parsed
+    once unless it changes
+
+    :param path: Absolute path to curations JSON file
+    :type path: str
+    :param mtime: Modification time of **path**, only used as
+                  part of the cache key
+    :type mtime: float
+    :return: curations
+    :rtype: list
+    """
+    with open(path, 'rb') as f:
+        return json_loads(f.read())
+
+
+def write_cx_to_file(cx, outfile):
+    """
+    Writes **cx** to **outfile**. Each aspect is
+    serialized and written separately so the full CX document is
+    never held in memory as a single string
+
+    :param cx: Network in CX format as returned by
+               :py:meth:`~ndex2.nice_cx_network.NiceCXNetwork.to_cx`
+    :type cx: list
+    :param outfile: Path to write CX to
+    :type outfile: str
+    :return: None
+    """
+    with open(outfile, 'wb') as f:
+        f.write(b'[')
+        for idx, aspect in enumerate(cx):
+            if idx > 0:
+                f.write(b',')
+            f.write(json_dumps(aspect))
+        f.write(b']')
+
+
 def get_next_network_from_input(input, cachedir=None, server=None, username=None,
-                                password=None, ndexobj=ndex2):
+                                password=None, ndexobj=None, ndex_client=None):
     """
     Generator to get networks from `input` which can be a path to a
     single CX file or a file containing a list of NDEx network UUIDs
@@ -207,55 +313,75 @@ def get_next_network_from_input(input, cachedir=None, server=None, username=None
     :param input: Path to a single CX file or a file
                   containing a list of NDEx network UUIDs
     :type input: str
+    :param ndexobj: Module used to load networks, if ``None``
+                    :py:mod:`ndex2` is used
+    :param ndex_client: NDEx client used to download networks. If
+                        ``None`` one is created from **server**,
+                        **username**, and **password** on first download
+                        and reused for the rest so connections to
+                        the server are kept open
+    :type ndex_client: :py:class:`~ndex2.client.Ndex2`
     :return: (:py:class:`ndex2.nice_cx_network.NiceCXNetwork,
               CX file name or NDEx UUID,
               path to cache file or None)
     :rtype: tuple
     """
 
+    import ndex2
+    if ndexobj is None:
+        ndexobj = ndex2
+
+    # list cache directory once instead of checking
+    # for a cache file for every network
+    cached_files = set()
+    if cachedir is not None and os.path.isdir(cachedir):
+        cached_files = set(os.listdir(cachedir))
+
     # if input is a file
     if os.path.isfile(input):
         # and ends with .cx assume it is a CX file and load that
         if input.lower().endswith('.cx'):
-            net_cx = ndex2.create_nice_cx_from_file(input)
+            net_cx = _load_cx_file(input)
             file_name = os.path.basename(input)
             cache_file = None
-            if cachedir is not None:
+            if file_name + '.json' in cached_files:
                 cache_file = os.path.join(cachedir,
                                           file_name + '.json')
-                if not os.path.isfile(cache_file):
-                    cache_file = None
             yield net_cx, file_name, cache_file
             return
 
         # otherwise assume file is a list of NDEx network ids
+        # read the whole file up front so it is not held open
+        # while networks are downloaded and processed
         with open(input, 'r') as f:
-            for line in f:
-                clean_line = line.rstrip()
-                if os.path.isfile(clean_line) and clean_line.lower().endswith('.cx'):
-                    net_cx = ndex2.create_nice_cx_from_file(clean_line)
-                    file_name = os.path.basename(clean_line)
-                    cache_file = None
-                    if cachedir is not None:
-                        cache_file = os.path.join(cachedir,
-                                                  file_name + '.json')
-                        if not os.path.isfile(cache_file):
-                            cache_file = None
-                    yield net_cx, file_name, cache_file
-                    continue
-                if len(clean_line) < 36:
-                    continue
-                net_cx = ndexobj.create_nice_cx_from_server(server=server,
-                                                            username=username,
-                                                            password=password,
-                                                            uuid=clean_line)
+            entries = [line.rstrip() for line in f]
+
+        for clean_line in entries:
+            if os.path.isfile(clean_line) and clean_line.lower().endswith('.cx'):
+                net_cx = _load_cx_file(clean_line)
+                file_name = os.path.basename(clean_line)
                 cache_file = None
-                if cachedir is not None:
+                if file_name + '.json' in cached_files:
                     cache_file = os.path.join(cachedir,
-                                              clean_line + '.json')
-                    if not os.path.isfile(cache_file):
-                        cache_file = None
-                yield net_cx, clean_line, cache_file
+                                              file_name + '.json')
+                yield net_cx, file_name, cache_file
+                continue
+            if len(clean_line) < 36:
+                continue
+            if ndex_client is None:
+                ndex_client = ndexobj.client.Ndex2(host=server,
+                                                   username=username,
+                                                   password=password)
+            net_cx = ndexobj.create_nice_cx_from_server(server=server,
+                                                        username=username,
+                                                        password=password,
+                                                        uuid=clean_line,
+                                                        ndex_client=ndex_client)
+            cache_file = None
+            if clean_line + '.json' in cached_files:
+                cache_file = os.path.join(cachedir,
+                                          clean_line + '.json')
+            yield net_cx, clean_line, cache_file
         return
 
     raise NDExIndraLoaderError('Input must be a CX file ending with .cx or '
@@ -267,6 +393,82 @@ def get_next_network_from_input(input, cachedir=None, server=None, username=None
     # and iterate through all the network ids
 
 
+def _prefetch(iterable, size=1):
+    """
+    Generator that consumes **iterable** in a background thread so
+    up to **size** items are fetched while the caller works on the
+    current one. Items are yielded in order and any exception raised
+    by **iterable** is re-raised to the caller
+
+    :param iterable: items to fetch
+    :type iterable: iterable
+    :param size: number of items to fetch ahead
+    :type size: int
+    :return: items from **iterable**
+    """
+    buf = queue.Queue(maxsize=size)
+    stop = threading.Event()
+    done = object()
+
+    def _put(entry):
+        while not stop.is_set():
+            try:
+                buf.put(entry, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def _producer():
+        try:
+            for item in iterable:
+                if not _put((item, None)):
+                    return
+        except Exception as e:
+            _put((done, e))
+            return
+        _put((done, None))
+
+    producer = threading.Thread(target=_producer, daemon=True)
+    producer.start()
+    try:
+        while True:
+            item, err = buf.get()
+            if item is done:
+                if err is not None:
+                    raise err
+                return
+            yield item
+    finally:
+        stop.set()
+
+
+def _gate(iterable, semaphore):
+    """
+    Generator that acquires **semaphore** before getting each item
+    from **iterable**. Caller must release **semaphore** once done
+    with each item, which limits how many items are in use at a time
+
+    :param iterable: items to get
+    :type iterable: iterable
+    :param semaphore: acquired once per item
+    :type semaphore: :py:class:`threading.BoundedSemaphore`
+    :return: items from **iterable**
+    """
+    iterator = iter(iterable)
+    while True:
+        semaphore.acquire()
+        try:
+            item = next(iterator)
+        except StopIteration:
+            semaphore.release()
+            return
+        except Exception:
+            semaphore.release()
+            raise
+        yield item
+
+
 class NDExIndraLoader(object):
     """
     Class to load content
@@ -277,11 +479,17 @@ class NDExIndraLoader(object):
     DEST_SERVER = 'dest_server'
 
     def __init__(self, args,
-                 py4cyto=Py4CytoscapeWrapper(),
-                 ndexextra=NDExExtraUtils()):
+                 py4cyto=None,
+                 ndexextra=None):
         """
 
         :param args:
+        :param py4cyto: Used to talk to Cytoscape, if ``None``
+                        :py:class:`~ndexutil.cytoscape.Py4CytoscapeWrapper`
+                        is used
+        :param ndexextra: if ``None``
+                          :py:class:`~ndexutil.ndex.NDExExtraUtils`
+                          is used
         """
         self._conf_file = args.conf
         self._profile = args.profile
@@ -293,90 +501,110 @@ class NDExIndraLoader(object):
         self._dest_server = None
         self._args = args
         self._template = None
+        self._saveasfile_dir = None
+        self._indracache_dir = None
+        if py4cyto is None:
+            from ndexutil.cytoscape import Py4CytoscapeWrapper
+            py4cyto = Py4CytoscapeWrapper()
         self._py4 = py4cyto
+        if ndexextra is None:
+            from ndexutil.ndex import NDExExtraUtils
+            ndexextra = NDExExtraUtils()
         self._ndexextra = ndexextra
-        try:
-            self._visibility = args.visibility
-        except AttributeError:
-            self._visibility = 'PUBLIC'
-        try:
-            self._indexlevel = args.indexlevel
-        except AttributeError:
-            logger.error('showcase was not found in args. Setting value to ALL')
-            self._indexlevel = 'ALL'
-
-        try:
-            self._showcase = not args.disableshowcase
-        except AttributeError:
-            logger.error('showcase was not found in args. Setting value to True')
-            self._showcase = True
+        # args may not come from _parse_arguments so fall back
+        # to the same defaults if these are missing
+        self._visibility = getattr(args, 'visibility', 'PUBLIC')
+        self._indexlevel = getattr(args, 'indexlevel', 'ALL')
+        self._showcase = not getattr(args, 'disableshowcase', False)
 
         self._networksystemproperty_retry = 3
         self._networksystemproperty_wait = 1
 
+        # Cytoscape layouts share temp files and a single
+        # Cytoscape instance so they must not run concurrently
+        self._cytoscape_lock = threading.Lock()
+
     def _parse_config(self):
             """
             Parses config
             :return:
             """
-            ncon = NDExUtilConfig(conf_file=self._conf_file)
-            con = ncon.get_config()
+            if self._conf_file is not None and\
+                    os.path.isfile(self._conf_file):
+                conf_path = os.path.abspath(self._conf_file)
+                con = _load_config_cached(conf_path,
+                                          os.path.getmtime(conf_path))
+            else:
+                ncon = NDExUtilConfig(conf_file=self._conf_file)
+                con = ncon.get_config()
             self._user = con.get(self._profile, NDExUtilConfig.USER)
             self._pass = con.get(self._profile, NDExUtilConfig.PASSWORD)
             self._server = con.get(self._profile, NDExUtilConfig.SERVER)
 
-            if con.has_option(self._profile,
-                                      NDExIndraLoader.DEST_USER):
-                self._dest_user = con.get(self._profile,
-                                          NDExIndraLoader.DEST_USER)
-            else:
-                self._dest_user = self._user
-
-            if con.has_option(self._profile,
-                                      NDExIndraLoader.DEST_PASSWORD):
-                self._dest_pass = con.get(self._profile,
-                                          NDExIndraLoader.DEST_PASSWORD)
-            else:
-                self._dest_pass = self._pass
-
-            if con.has_option(self._profile,
-                                        NDExIndraLoader.DEST_SERVER):
-                self._dest_server = con.get(self._profile,
-                                            NDExIndraLoader.DEST_SERVER)
-            else:
-                self._dest_server = self._server
+            self._dest_user = con.get(self._profile,
+                                      NDExIndraLoader.DEST_USER,
+                                      fallback=self._user)
+            self._dest_pass = con.get(self._profile,
+                                      NDExIndraLoader.DEST_PASSWORD,
+                                      fallback=self._pass)
+            self._dest_server = con.get(self._profile,
+                                        NDExIndraLoader.DEST_SERVER,
+                                        fallback=self._server)
 
     def _load_style_template(self):
         """
         Loads the CX network specified by self._args.style into self._template
+        If self._args.style is ``None`` it is set to the style.cx
+        file in this package
         :return:
         """
+        if self._args.style is None:
+            self._args.style = os.path.join(os.path.dirname(ndexindraloader.__file__),
+                                            'style.cx')
         if self._args.style is not None and os.path.isfile(self._args.style):
-            self._template = ndex2.create_nice_cx_from_file(os.path.abspath(self._args.style))
+            style_path = os.path.abspath(self._args.style)
+            self._template = _load_style_template_cached(style_path,
+                                                         os.path.getmtime(style_path))
 
     def _create_saveasfile_dir(self):
         """
+        Creates directory set by ``--saveasfile`` if needed. The
+        directory is only checked on first call, subsequent
+        calls return the same path
 
-        :return:
+        :return: absolute path to directory or ``None`` if
+                 ``--saveasfile`` is not set
+        :rtype: str
         """
+        if self._saveasfile_dir is not None:
+            return self._saveasfile_dir
         if self._args.saveasfile is not None:
             outdir = os.path.abspath(self._args.saveasfile)
             if not os.path.isdir(outdir):
                 logger.debug('Creating directory: ' + outdir)
-                os.makedirs(outdir, mode=0o755)
+                os.makedirs(outdir, mode=0o755, exist_ok=True)
+            self._saveasfile_dir = outdir
             return outdir
         return None
 
     def _create_indracache(self):
         """
+        Creates directory set by ``--indracachedir`` if needed. The
+        directory is only checked on first call, subsequent
+        calls return the same path
 
-        :return:
+        :return: absolute path to directory or ``None`` if
+                 ``--indracachedir`` is not set
+        :rtype: str
         """
+        if self._indracache_dir is not None:
+            return self._indracache_dir
         if self._args.indracachedir is not None:
             cachedir = os.path.abspath(self._args.indracachedir)
             if not os.path.isdir(cachedir):
                 logger.debug('Creating indra cache directory')
-                os.makedirs(cachedir, mode=0o755)
+                os.makedirs(cachedir, mode=0o755, exist_ok=True)
+            self._indracache_dir = cachedir
             return cachedir
         return None
 
@@ -393,9 +621,16 @@ class NDExIndraLoader(object):
         :return: coordinates
         :rtype: list
         """
+        import numpy as np
+
+        # convert all positions in one shot, tolist() gives back
+        # python floats which is what the CX serializers expect
+        coords = np.array(list(g.pos.values()),
+                          dtype=np.float64).reshape(-1, 2)
+        coords[:, 1] *= -1
         return [{'node': n,
-                 'x': float(g.pos[n][0]),
-                 'y': -float(g.pos[n][1])} for n in g.pos]
+                 'x': x,
+                 'y': y} for n, (x, y) in zip(g.pos, coords.tolist())]
 
     def _apply_cytolayoutservice_layout(self, network, layoutname=None,
                                         layoutargs=None):
@@ -451,7 +686,8 @@ class NDExIndraLoader(object):
 
         network.set_opaque_aspect('cartesianLayout', res.json()['result'])
 
-    def _apply_simple_spring_layout(self, network, iterations=50):
+    def _apply_simple_spring_layout(self, network, iterations=50,
+                                    num_nodes=None):
         """
         Applies simple spring network by using
         :py:func:`networkx.drawing.spring_layout` and putting the
@@ -463,11 +699,24 @@ class NDExIndraLoader(object):
         :param iterations: Number of iterations to use for networkx spring layout call
                            default is 50
         :type iterations: int
+        :param num_nodes: Number of nodes in **network**, if ``None``
+                          value is obtained from **network**
+        :type num_nodes: int
         :return: None
         """
-
-        num_nodes = len(network.get_nodes())
-        my_networkx = network.to_networkx(mode='default')
+        import networkx as nx
+
+        if num_nodes is None:
+            num_nodes = len(network.get_nodes())
+
+        # layout only needs topology so skip copying node and
+        # edge attributes that to_networkx() would bring along
+        my_networkx = nx.MultiGraph()
+        my_networkx.add_nodes_from(node_id for node_id, node_obj
+                                   in network.get_nodes())
+        my_networkx.add_edges_from((edge_obj['s'], edge_obj['t'])
+                                   for edge_id, edge_obj
+                                   in network.get_edges())
         if num_nodes < 10:
             nodescale = num_nodes*20
         elif num_nodes < 20:
@@ -480,10 +729,32 @@ class NDExIndraLoader(object):
         my_networkx.pos = nx.drawing.spring_layout(my_networkx,
                                                    scale=nodescale,
                                                    k=1.8,
+                                                   weight=None,
                                                    iterations=iterations)
         cartesian_aspect = self._cartesian(my_networkx)
         network.set_opaque_aspect("cartesianLayout", cartesian_aspect)
 
+    def _should_apply_layout(self, network):
+        """
+        Determines if layout should be applied to **network**. This
+        is the case if ``--layout`` is set and **network** lacks
+        a ``cartesianLayout`` aspect, or if ``--force_layout`` is set
+
+        :param network: Network to check
+        :type network: :py:class:`~ndex2.nice_cx_network.NiceCXNetwork`
+        :return: ``True`` if layout should be applied
+        :rtype: bool
+        """
+        if self._args.layout is None:
+            return False
+        if self._args.force_layout is True:
+            return True
+        if network.get_opaque_aspect('cartesianLayout') is not None:
+            logger.info('Network already has a layout, skipping. '
+                        'To override set --force_layout flag')
+            return False
+        return True
+
     def _apply_cytoscape_layout(self, network):
         """
         Applies Cytoscape layout on network
@@ -497,56 +768,56 @@ class NDExIndraLoader(object):
             raise NDExIndraLoaderError('Cytoscape needs to be running to run '
                                        'layout: ' + str(self._args.layout))
 
-        tmp_cx_file = os.path.join(self._args.tmpdir,
-                                   str(uuid.uuid4()) +
-                                   '-tmp.cx')
-
-        with open(tmp_cx_file, 'w') as f:
-            json.dump(network.to_cx(), f)
-
-        annotated_cx_file = os.path.join(self._args.tmpdir,
-                                         str(uuid.uuid4()) +
-                                         'annotated.tmp.cx')
-
-        self._ndexextra.add_node_id_as_node_attribute(cxfile=tmp_cx_file,
-                                                      outcxfile=annotated_cx_file)
-        file_size = os.path.getsize(annotated_cx_file)
-
-        logger.info('Importing network from file: ' + annotated_cx_file +
-                    ' (' + str(file_size) + ' bytes) into Cytoscape')
-        net_dict = self._py4.import_network_from_file(annotated_cx_file,
-                                                      base_url=self._args.cyresturl)
-        if 'networks' not in net_dict:
-            raise NDExIndraLoaderError('Error network view could not '
-                                       'be created, this could be cause '
-                                       'this network is larger then '
-                                       '100,000 edges. Try increasing '
-                                       'viewThreshold property in '
-                                       'Cytoscape preferences')
-
-        os.unlink(annotated_cx_file)
-        net_suid = net_dict['networks'][0]
-
-        logger.info('Applying layout ' + self._args.layout +
-                    ' on network with suid: ' +
-                    str(net_suid) + ' in Cytoscape')
-        res = self._py4.layout_network(layout_name=self._args.layout,
-                                       network=net_suid,
-                                       base_url=self._args.cyresturl)
-        logger.debug(res)
-
-        os.unlink(tmp_cx_file)
-
-        logger.info('Writing cx to: ' + tmp_cx_file)
-        res = self._py4.export_network(filename=tmp_cx_file, type='CX',
-                                       network=net_suid,
-                                       base_url=self._args.cyresturl)
-        self._py4.delete_network(network=net_suid,
-                                 base_url=self._args.cyresturl)
-        logger.debug(res)
-
-        layout_aspect = self._ndexextra.extract_layout_aspect_from_cx(input_cx_file=tmp_cx_file)
-        network.set_opaque_aspect('cartesianLayout', layout_aspect)
+        tmp_file_prefix = os.path.join(self._args.tmpdir,
+                                       str(uuid.uuid4()))
+        tmp_cx_file = tmp_file_prefix + '-tmp.cx'
+        annotated_cx_file = tmp_file_prefix + 'annotated.tmp.cx'
+        try:
+            write_cx_to_file(network.to_cx(), tmp_cx_file)
+
+            self._ndexextra.add_node_id_as_node_attribute(cxfile=tmp_cx_file,
+                                                          outcxfile=annotated_cx_file)
+            file_size = os.path.getsize(annotated_cx_file)
+
+            logger.info('Importing network from file: ' + annotated_cx_file +
+                        ' (' + str(file_size) + ' bytes) into Cytoscape')
+            net_dict = self._py4.import_network_from_file(annotated_cx_file,
+                                                          base_url=self._args.cyresturl)
+            if 'networks' not in net_dict:
+                raise NDExIndraLoaderError('Error network view could not '
+                                           'be created, this could be cause '
+                                           'this network is larger then '
+                                           '100,000 edges. Try increasing '
+                                           'viewThreshold property in '
+                                           'Cytoscape preferences')
+
+            os.unlink(annotated_cx_file)
+            net_suid = net_dict['networks'][0]
+
+            logger.info('Applying layout ' + self._args.layout +
+                        ' on network with suid: ' +
+                        str(net_suid) + ' in Cytoscape')
+            res = self._py4.layout_network(layout_name=self._args.layout,
+                                           network=net_suid,
+                                           base_url=self._args.cyresturl)
+            logger.debug(res)
+
+            os.unlink(tmp_cx_file)
+
+            logger.info('Writing cx to: ' + tmp_cx_file)
+            res = self._py4.export_network(filename=tmp_cx_file, type='CX',
+                                           network=net_suid,
+                                           base_url=self._args.cyresturl)
+            self._py4.delete_network(network=net_suid,
+                                     base_url=self._args.cyresturl)
+            logger.debug(res)
+
+            layout_aspect = self._ndexextra.extract_layout_aspect_from_cx(input_cx_file=tmp_cx_file)
+            network.set_opaque_aspect('cartesianLayout', layout_aspect)
+        finally:
+            for tmp_file in [tmp_cx_file, annotated_cx_file]:
+                if os.path.isfile(tmp_file):
+                    os.unlink(tmp_file)
 
     def run(self):
         """
@@ -566,13 +837,17 @@ class NDExIndraLoader(object):
         cachedir = self._create_indracache()
         outdir = self._create_saveasfile_dir()
 
+        client = None
         if self._args.savetoserver is True:
+            import ndex2
             client = ndex2.client.Ndex2(host=self._dest_server,
                                         username=self._dest_user,
                                         password=self._dest_pass,
                                         user_agent='NDExIndraLoader/' +
                                                    str(ndexindraloader.__version__))
 
+        from tqdm import tqdm
+
         self._load_style_template()
         t_progress = tqdm(desc='Indra annotate', unit=' tasks',
                           disable=self._args.disable_tqdm)
@@ -584,87 +859,155 @@ class NDExIndraLoader(object):
                                                                         curationurl=self._args.curationsurl)),
                        MedscanStatementFilter()]
         indra = Indra(stmtfilters=stmtfilters)
-        for net_tuple in get_next_network_from_input(self._args.input,
-                                                     cachedir=cachedir,
-                                                     server=self._server,
-                                                     username=self._user,
-                                                     password=self._pass):
-
-            logger.debug('Processing: ' + net_tuple[0].get_name())
-
-            num_nodes = len(net_tuple[0].get_nodes())
-            if num_nodes > self._args.maxnetworksize:
-                logger.error('Network has ' + str(num_nodes) +
-                             ' which exceeds ' + str(self._args.maxnetworksize) +
-                             '. To increase set --maxnetworksize flag. skipping')
-                continue
-            if net_tuple[2] is None:
-                save_indra_res = True
-                indra_data = None
+
+        if self._args.layout == '-':
+            self._args.layout = 'force-directed'
+
+        process_network = functools.partial(self._process_network,
+                                            indra=indra,
+                                            cachedir=cachedir,
+                                            outdir=outdir,
+                                            client=client)
+
+        net_tuples = get_next_network_from_input(self._args.input,
+                                                 cachedir=cachedir,
+                                                 server=self._server,
+                                                 username=self._user,
+                                                 password=self._pass)
+        if self._args.jobs > 1:
+            # ThreadPool pulls tasks from the generator as fast as it can
+            # so limit networks in flight to --jobs or every network in
+            # input would be downloaded and held in memory at once
+            in_flight = threading.BoundedSemaphore(self._args.jobs)
+
+            def process_and_release(net_tuple):
+                try:
+                    return process_network(net_tuple)
+                finally:
+                    in_flight.release()
+
+            with ThreadPool(self._args.jobs) as pool:
+                for processed in pool.imap_unordered(process_and_release,
+                                                     _gate(net_tuples,
+                                                           in_flight)):
+                    if processed is True:
+                        t_progress.update()
+        else:
+            # download next network while current one is processed
+            for net_tuple in _prefetch(net_tuples):
+                if process_network(net_tuple) is True:
+                    t_progress.update()
+
+        t_progress.close()
+
+        return 0
+
+    def _process_network(self, net_tuple, indra=None, cachedir=None,
+                         outdir=None, client=None):
+        """
+        Annotates, styles, lays out and saves a single network. This
+        method is called concurrently from multiple threads when
+        ``--jobs`` is greater then 1
+
+        :param net_tuple: Network as yielded by
+                          :py:func:`get_next_network_from_input`
+        :type net_tuple: tuple
+        :param indra: Used to annotate network
+        :type indra: :py:class:`~ndexindraloader.indra.Indra`
+        :param cachedir: Directory containing INDRA cache or ``None``
+        :type cachedir: str
+        :param outdir: Directory to save annotated network or ``None``
+        :type outdir: str
+        :param client: NDEx client used to save network if
+                       ``--savetoserver`` is set
+        :type client: :py:class:`~ndex2.client.Ndex2`
+        :return: ``True`` if network was processed, ``False`` if skipped
+        :rtype: bool
+        """
+        logger.debug('Processing: ' + net_tuple[0].get_name())
+
+        num_nodes = len(net_tuple[0].get_nodes())
+        if num_nodes > self._args.maxnetworksize:
+            logger.error('Network has ' + str(num_nodes) +
+                         ' which exceeds ' + str(self._args.maxnetworksize) +
+                         '. To increase set --maxnetworksize flag. skipping')
+            return False
+        indra_data = None
+        if net_tuple[2] is not None:
+            indra_data = load_json_cache_file(net_tuple[2])
+        if indra_data is None:
+            save_indra_res = True
+        else:
+            logger.info('Using cached INDRA version: ' + net_tuple[2])
+            save_indra_res = False
+
+        net_cx, indra_res = indra.annotate_network(net_cx=net_tuple[0],
+                                                   netprefix=self._args.netprefix,
+                                                   indraresult=indra_data,
+                                                   source_value=self._args.sourcevalue)
+
+        if self._template is not None:
+            logger.debug('Applying style from file: ' + self._args.style)
+            net_cx.apply_style_from_network(self._template)
+
+        if self._should_apply_layout(net_cx):
+            if self._args.layout == 'spring':
+                self._apply_simple_spring_layout(net_cx, num_nodes=num_nodes)
+            elif self._args.layout == 'cdqforcelayout':
+                largs = None
+                if self._args.cytolayoutargs is not None:
+                    largs = json.loads(self._args.cytolayoutargs)
+                self._apply_cytolayoutservice_layout(net_cx, layoutname=self._args.layout,
+                                                     layoutargs=largs)
             else:
-                with open(net_tuple[2], 'r') as f:
-                    indra_data = json.load(f)
-                logger.info('Using cached INDRA version: ' + net_tuple[2])
-                save_indra_res = False
-
-            net_cx, indra_res = indra.annotate_network(net_cx=net_tuple[0],
-                                                       netprefix=self._args.netprefix,
-                                                       indraresult=indra_data,
-                                                       source_value=self._args.sourcevalue)
-
-            if self._template is not None:
-                logger.debug('Applying style from file: ' + self._args.style)
-                net_cx.apply_style_from_network(self._template)
-
-            if self._args.layout is not None:
-                if self._args.layout == 'spring':
-                    self._apply_simple_spring_layout(net_cx)
-                elif self._args.layout == 'cdqforcelayout':
-                    largs = None
-                    if self._args.cytolayoutargs is not None:
-                        largs = json.loads(self._args.cytolayoutargs)
-                    self._apply_cytolayoutservice_layout(net_cx, layoutname=self._args.layout,
-                                                         layoutargs=largs)
-                else:
-                    if self._args.layout == '-':
-                        self._args.layout = 'force-directed'
+                with self._cytoscape_lock:
                     self._apply_cytoscape_layout(net_cx)
 
-            if outdir is not None:
-                outfile = os.path.join(outdir,
-                                       net_tuple[1] + '.cx')
-                logger.debug('Saving network to file: ' + outfile)
-                with open(outfile, 'w') as f:
-                    json.dump(net_cx.to_cx(), f)
-
-            if save_indra_res is True:
-                if cachedir is not None:
-                    outfile = os.path.join(cachedir,
-                                           net_tuple[1] + '.json')
-                    logger.debug('Saving INDRA json to file: ' + outfile)
-                    with open(outfile, 'w') as f:
-                        json.dump(indra_res, f)
+        # network is not modified from here on so only
+        # generate CX once for saving to file and to NDEx
+        net_cx_as_cx = None
+        if outdir is not None or self._args.savetoserver is True:
+            net_cx_as_cx = net_cx.to_cx()
 
-            if self._args.savetoserver is True:
-                logger.debug('Saving network as a new network to user ' +
-                             str(self._dest_user) + ' on NDEx '
-                             'server: ' + str(self._dest_server))
-                client.save_new_network(net_cx.to_cx())
-            t_progress.update()
+        if outdir is not None:
+            outfile = os.path.join(outdir,
+                                   net_tuple[1] + '.cx')
+            logger.debug('Saving network to file: ' + outfile)
+            write_cx_to_file(net_cx_as_cx, outfile)
 
-        t_progress.close()
+        if save_indra_res is True:
+            if cachedir is not None:
+                outfile = os.path.join(cachedir,
+                                       net_tuple[1] + '.json')
+                logger.debug('Saving INDRA json to file: ' + outfile)
+                write_file_atomically(outfile, json_dumps(indra_res))
 
-        return 0
+        if self._args.savetoserver is True:
+            logger.debug('Saving network as a new network to user ' +
+                         str(self._dest_user) + ' on NDEx '
+                         'server: ' + str(self._dest_server))
+            client.save_new_network(net_cx_as_cx)
+        return True
 
     def _get_curation_list(self, curation, curationurl=None):
         """
-
-        :param curation:
-        :return:
+        Gets curations from file or INDRA service
+
+        :param curation: Path to curations JSON file or api key
+                         to download curations from **curationurl**
+        :type curation: str
+        :param curationurl: URL to download curations from
+        :type curationurl: str
+        :return: curations or ``None`` if **curation** is ``None``
+        :rtype: list
         """
+        if curation is None:
+            return None
+
         if os.path.isfile(curation):
-            with open(curation, 'r') as f:
-                return json.load(f)
+            curation_path = os.path.abspath(curation)
+            return _load_curation_file_cached(curation_path,
+                                              os.path.getmtime(curation_path))
 
         # curation is not a file, assume it is an api key and download
         # curations from curationurl and return as dict
@@ -730,5 +1073,14 @@ def main(args):
         logging.shutdown()
 
 
-if __name__ == '__main__':  # pragma: no cover
+def main_cli():  # pragma: no cover
+    """
+    Entry point for ``ndexloadindra.py`` command installed
+    by setup.py
+    :return:
+    """
     sys.exit(main(sys.argv))
+
+
+if __name__ == '__main__':  # pragma: no cover
+    main_cli()
@@ -21,6 +21,8 @@ with open('HISTORY.rst') as history_file:
 requirements = ['ndex2>=3.4.0,<4.0.0',
                 'ndexutil>=0.13.1',
                 'networkx',
+                'numpy',
+                'orjson',
                 'requests',
                 'tqdm']
 
@@ -51,7 +53,11 @@ setup(
     packages=find_packages(include=['ndexindraloader']),
     package_dir={'ndexindraloader': 'ndexindraloader'},
     package_data={'ndexindraloader': ['style.cx']},
-    scripts=['ndexindraloader/ndexloadindra.py'],
+    entry_points={
+        'console_scripts': [
+            'ndexloadindra.py=ndexindraloader.ndexloadindra:main_cli',
+        ],
+    },
     setup_requires=setup_requirements,
     test_suite='tests',
     tests_require=test_requirements,
@@ -0,0 +1,22 @@
+# -*- coding: utf-8 -*-
+
+"""Test data shared across test modules."""
+
+import functools
+from ndexindraloader.indra import json_loads
+
+
+@functools.lru_cache(maxsize=4)
+def load_indra_result(path):
+    """
+    Loads INDRA result JSON file at **path**. Result is parsed once
+    and the same object is returned to every caller so tests must
+    not modify it
+
+    :param path: Path to INDRA result JSON file
+    :type path: str
+    :return: INDRA result
+    :rtype: dict
+    """
+    with open(path, 'rb') as f:
+        return json_loads(f.read())
@@ -3,10 +3,6 @@
 
 """Tests for `IncorrectStatementFilter` package."""
 
-import os
-import json
-
-
 import unittest
 from ndexindraloader.indra import IncorrectStatementFilter
 
@@ -52,7 +48,7 @@ class TestIncorrectStatementFilter(unittest.TestCase):
                                                            'eidos': 1}}}}
         res, report = filter.filter(edge_evidence)
         self.assertEqual('', report)
-        self.assertEqual(edge_evidence, res)
+        self.assertIs(edge_evidence, res)
 
     def test_filter_curations_good(self):
         curations = [{'pa_hash': 1,
@@ -89,6 +85,9 @@ class TestIncorrectStatementFilter(unittest.TestCase):
                          'curations\n', report)
         self.assertEqual({'stmts': {}}, res)
 
+        # input should not be modified
+        self.assertEqual(1, len(edge_evidence['stmts']))
+
     def test_filter_one_good_one_bad_stmt(self):
         curations = [{'pa_hash': 1,
                       'tag': 'grounding'},
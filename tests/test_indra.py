@@ -4,18 +4,20 @@
 """Tests for `indra` package."""
 
 import os
-import json
+import copy
 import tempfile
 import shutil
 
 import unittest
 from unittest.mock import MagicMock
+from unittest.mock import patch
 from ndex2.nice_cx_network import NiceCXNetwork
 import ndex2
 from ndexindraloader.exceptions import NDExIndraLoaderError
 from ndexindraloader.indra import Indra
 from ndexindraloader import indra
 from ndexindraloader.indra import StatementFilter
+from tests._fixtures import load_indra_result
 
 
 class TestIndra(unittest.TestCase):
@@ -28,12 +30,40 @@ class TestIndra(unittest.TestCase):
     EPHB_FORWARDING_INDRA = os.path.join(os.path.dirname(__file__), 'data',
                                          '01c81f4a-6192-11e5-8ac5-06603eb7f'
                                          '303.json')
+
+    @classmethod
+    def setUpClass(cls):
+        """
+        Loads INDRA result for EPHB network and creates temp
+        directory once for all tests
+        """
+        cls._ephb_indrares = load_indra_result(cls.EPHB_FORWARDING_INDRA)
+
+        # Indra holds no per call state so one instance can be
+        # shared by tests that do not replace its methods
+        cls._indra = Indra()
+        cls._temp_root = tempfile.mkdtemp()
+
+    @classmethod
+    def tearDownClass(cls):
+        """Removes temp directory shared by all tests"""
+        shutil.rmtree(cls._temp_root)
+
     def setUp(self):
         """Set up test fixtures, if any."""
 
     def tearDown(self):
         """Tear down test fixtures, if any."""
 
+    def _get_temp_dir(self):
+        """
+        Creates an empty directory for the current test under
+        the temp directory shared by this class
+        """
+        temp_dir = os.path.join(self._temp_root, self.id().split('.')[-1])
+        os.mkdir(temp_dir)
+        return temp_dir
+
     def test_get_members_of_family_node(self):
         net = NiceCXNetwork()
         node_one = net.create_node('node1')
@@ -116,11 +146,11 @@ class TestIndra(unittest.TestCase):
         e_one = net.create_edge(edge_source=node_one, edge_target=node_two)
         net.set_edge_attribute(e_one, 'foo', values='somedata')
         e_two = net.create_edge(edge_source=node_two, edge_target=node_one)
-        self.assertEqual(2, len(net.get_edges()))
+        self.assertEqual(2, len(net.edges))
         indra.remove_edge(net_cx=net, edge_id=e_one)
-        self.assertEqual(1, len(net.get_edges()))
+        self.assertEqual(1, len(net.edges))
         indra.remove_edge(net_cx=net, edge_id=e_two)
-        self.assertEqual(0, len(net.get_edges()))
+        self.assertEqual(0, len(net.edges))
 
     def test_add_source_to_existing_edges_sourceval_is_none(self):
         net = NiceCXNetwork()
@@ -129,7 +159,7 @@ class TestIndra(unittest.TestCase):
         e_one = net.create_edge(edge_source=node_one, edge_target=node_two)
         e_two = net.create_edge(edge_source=node_two, edge_target=node_one)
 
-        indraobj = Indra()
+        indraobj = TestIndra._indra
         indraobj._add_source_to_existing_edges(net_cx=net, source_value=None)
 
         e_attr = net.get_edge_attribute(e_one, Indra.SOURCE)
@@ -145,7 +175,7 @@ class TestIndra(unittest.TestCase):
         e_one = net.create_edge(edge_source=node_one, edge_target=node_two)
         e_two = net.create_edge(edge_source=node_two, edge_target=node_one)
 
-        indraobj = Indra()
+        indraobj = TestIndra._indra
         indraobj._add_source_to_existing_edges(net_cx=net, source_value='some source')
 
         e_attr = net.get_edge_attribute(e_one, Indra.SOURCE)
@@ -154,6 +184,26 @@ class TestIndra(unittest.TestCase):
         e_attr = net.get_edge_attribute(e_two, Indra.SOURCE)
         self.assertEqual('some source', e_attr['v'])
 
+    def test_add_source_to_existing_edges_keeps_existing_source(self):
+        net = NiceCXNetwork()
+        node_one = net.create_node('node1')
+        node_two = net.create_node('node2')
+        e_one = net.create_edge(edge_source=node_one, edge_target=node_two)
+        net.set_edge_attribute(e_one, 'foo', 'bar')
+        e_two = net.create_edge(edge_source=node_two, edge_target=node_one)
+        net.set_edge_attribute(e_two, Indra.SOURCE, 'orig')
+
+        indraobj = TestIndra._indra
+        indraobj._add_source_to_existing_edges(net_cx=net, source_value='some source')
+
+        e_attr = net.get_edge_attribute(e_one, Indra.SOURCE)
+        self.assertEqual('some source', e_attr['v'])
+        self.assertEqual('bar', net.get_edge_attribute(e_one, 'foo')['v'])
+
+        e_attr = net.get_edge_attribute(e_two, Indra.SOURCE)
+        self.assertEqual('orig', e_attr['v'])
+        self.assertEqual(1, len(net.get_edge_attributes(e_two)))
+
     def test_remove_original_edges(self):
         net = NiceCXNetwork()
         node_one = net.create_node('node1')
@@ -161,15 +211,16 @@ class TestIndra(unittest.TestCase):
         e_one = net.create_edge(edge_source=node_one, edge_target=node_two)
         net.set_edge_attribute(e_one, 'foo', values='somedata')
         net.create_edge(edge_source=node_two, edge_target=node_one)
-        indraobj = Indra()
+        indraobj = TestIndra._indra
         indraobj._remove_original_edges(net_cx=net)
-        self.assertEqual(2, len(net.get_edges()))
+        self.assertEqual(2, len(net.edges))
 
         indraobj._remove_original_edges(net_cx=net, remove_orig_edges=False)
-        self.assertEqual(2, len(net.get_edges()))
+        self.assertEqual(2, len(net.edges))
 
         indraobj._remove_original_edges(net_cx=net, remove_orig_edges=True)
-        self.assertEqual(0, len(net.get_edges()))
+        self.assertEqual(0, len(net.edges))
+        self.assertEqual((None, None), net.get_edge_attribute(e_one, 'foo'))
 
     def test_get_indra_query_dict(self):
         net = NiceCXNetwork()
@@ -181,7 +232,7 @@ class TestIndra(unittest.TestCase):
                                        'gene2'],
                                type='list_of_string', overwrite=True)
 
-        indraobj = Indra()
+        indraobj = TestIndra._indra
         res = indraobj._get_indra_query_dict(net_cx=net)
         self.assertTrue('nodes' in res)
         self.assertEqual(4, len(res['nodes']))
@@ -206,8 +257,35 @@ class TestIndra(unittest.TestCase):
                           'identifier': '0',
                           'lookup': None}, node_dict['gene2'])
 
-    def test_get_source_target_key(self):
+    def test_get_indra_query_dict_order_matches_annotate_network(self):
+        net = NiceCXNetwork()
+        net.create_node('node1')
+        node_two = net.create_node('node2')
+
+        # gene1 is also the name of a node
+        net.set_node_attribute(node=node_two, attribute_name='member',
+                               values=['hgnc.symbol:gene1',
+                                       'gene2'],
+                               type='list_of_string', overwrite=True)
+        net.create_node('gene1')
+
         indraobj = Indra()
+        res = indraobj._get_indra_query_dict(net_cx=net)
+        self.assertEqual(['node1', 'node2', 'gene1', 'gene2', 'gene1'],
+                         [entry['name'] for entry in res['nodes']])
+
+        # annotate_network should post the same query
+        mockresp = MagicMock()
+        mockresp.status_code = 200
+        mockresp.content = b'{"edges": []}'
+        net.set_name('foo')
+        with patch('ndexindraloader.indra.requests.post',
+                   return_value=mockresp) as mockpost:
+            indraobj.annotate_network(net_cx=net)
+        self.assertEqual(res, mockpost.call_args[1]['json'])
+
+    def test_get_source_target_key(self):
+        indraobj = TestIndra._indra
         res = indraobj._get_source_target_key(src_node_id=0, target_node_id=1)
         self.assertEqual(('0_1', False), res)
 
@@ -217,13 +295,183 @@ class TestIndra(unittest.TestCase):
         res = indraobj._get_source_target_key(src_node_id=1, target_node_id=0)
         self.assertEqual(('0_1', True), res)
 
+    def test_single_edge_adder(self):
+        net = NiceCXNetwork()
+        node_one = net.create_node('node1')
+        node_two = net.create_node('node2')
+        stmt_list = [{'stmt_type': 'Complex', 'stmt_hash': 1,
+                      'english': 'node1 binds node2.',
+                      'evidence_count': 2, 'isreversed': False,
+                      'source_node': 'node1', 'target_node': 'node2'},
+                     {'stmt_type': 'Activation', 'stmt_hash': 2,
+                      'english': 'node2 activates node1.',
+                      'evidence_count': 1, 'isreversed': True,
+                      'source_node': 'node2', 'target_node': 'node1'}]
+        indraobj = TestIndra._indra
+        edge_id = indraobj._single_edge_adder(net_cx=net,
+                                              src_node_id=node_one,
+                                              target_node_id=node_two,
+                                              stmt_list=stmt_list)
+        self.assertEqual(1, len(net.edges))
+        self.assertEqual('INDRA',
+                         net.get_edge_attribute(edge_id, Indra.SOURCE)['v'])
+        self.assertAlmostEqual(1.0986, net.get_edge_attribute(edge_id,
+                                                              Indra.RELATIONSHIP_SCORE)['v'],
+                               places=4)
+        self.assertFalse(net.get_edge_attribute(edge_id, Indra.DIRECTED)['v'])
+        self.assertTrue(net.get_edge_attribute(edge_id,
+                                               Indra.REVERSE_DIRECTED)['v'])
+        rel = net.get_edge_attribute(edge_id, Indra.RELATIONSHIPS)['v']
+        self.assertTrue(rel.startswith('All Evidences ('))
+        self.assertTrue('node1 binds node2(' in rel)
+        self.assertTrue('node2 activates node1(' in rel)
+
+    def test_single_edge_adder_zero_evidence(self):
+        net = NiceCXNetwork()
+        node_one = net.create_node('node1')
+        node_two = net.create_node('node2')
+        stmt_list = [{'stmt_type': 'Complex', 'stmt_hash': 1,
+                      'english': 'node1 binds node2.',
+                      'evidence_count': 0, 'isreversed': False,
+                      'source_node': 'node1', 'target_node': 'node2'}]
+        indraobj = TestIndra._indra
+        edge_id = indraobj._single_edge_adder(net_cx=net,
+                                              src_node_id=node_one,
+                                              target_node_id=node_two,
+                                              stmt_list=stmt_list)
+        self.assertEqual(0.0, net.get_edge_attribute(edge_id,
+                                                     Indra.RELATIONSHIP_SCORE)['v'])
+
+    def test_get_indra_result(self):
+        indraobj = Indra()
+
+        # try with result passed in
+        res = indraobj._get_indra_result(net_cx=None, indraresult={'a': 1})
+        self.assertEqual(({'a': 1}, 0), res)
+
+        # try with non 200 status code
+        mockresp = MagicMock()
+        mockresp.status_code = 500
+        mockresp.text = 'error'
+        indraobj.query_indra = MagicMock(return_value=(mockresp, 2))
+        try:
+            indraobj._get_indra_result(net_cx=None)
+            self.fail('Expected NDExIndraLoaderError')
+        except NDExIndraLoaderError as e:
+            self.assertEqual('Caught non 200 http code from query : '
+                             '500 : error', str(e))
+
+        # try with valid json
+        mockresp.status_code = 200
+        mockresp.content = b'{"edges": []}'
+        res = indraobj._get_indra_result(net_cx=None)
+        self.assertEqual(({'edges': []}, 2), res)
+
+        # try with invalid json
+        mockresp.content = b'{"edges": '
+        try:
+            indraobj._get_indra_result(net_cx=None)
+            self.fail('Expected NDExIndraLoaderError')
+        except NDExIndraLoaderError as e:
+            self.assertTrue('Caught Exception attempting to '
+                            'parse json from query' in str(e))
+
+    def test_get_indra_result_with_cache_dir(self):
+        temp_dir = self._get_temp_dir()
+        net = NiceCXNetwork()
+        net.create_node('node2')
+        net.create_node('node1')
+        mockresp = MagicMock()
+        mockresp.status_code = 200
+        mockresp.content = b'{"edges": []}'
+        indraobj = Indra(cache_dir=temp_dir)
+        indraobj.query_indra = MagicMock(return_value=(mockresp, 2))
+
+        # first call queries service and saves result
+        res = indraobj._get_indra_result(net_cx=net)
+        self.assertEqual(({'edges': []}, 2), res)
+        self.assertEqual(1, indraobj.query_indra.call_count)
+        self.assertEqual(1, len(os.listdir(temp_dir)))
+
+        # second call with same nodes in different order uses cache
+        net = NiceCXNetwork()
+        net.create_node('node1')
+        net.create_node('node2')
+        res = indraobj._get_indra_result(net_cx=net)
+        self.assertEqual(({'edges': []}, 0), res)
+        self.assertEqual(1, indraobj.query_indra.call_count)
+
+        # cache is ignored if use_cache is False
+        res = indraobj._get_indra_result(net_cx=net, use_cache=False)
+        self.assertEqual(({'edges': []}, 2), res)
+        self.assertEqual(2, indraobj.query_indra.call_count)
+
+    def test_get_cache_file_same_for_annotate_and_direct_query(self):
+        temp_dir = self._get_temp_dir()
+        net = NiceCXNetwork()
+        net.set_name('foo')
+        node_one = net.create_node('node1')
+        net.create_node('gene1')
+
+        # gene1 is a node name and a family member so it is
+        # listed twice in the INDRA query
+        net.set_node_attribute(node=node_one, attribute_name='member',
+                               values=['hgnc.symbol:gene1'],
+                               type='list_of_string', overwrite=True)
+        mockresp = MagicMock()
+        mockresp.status_code = 200
+        mockresp.content = b'{"edges": []}'
+        indraobj = Indra(cache_dir=temp_dir)
+        indraobj.query_indra = MagicMock(return_value=(mockresp, 2))
+
+        n_dict = indraobj._get_indra_query_dict(net_cx=net)
+        self.assertEqual(3, len(n_dict['nodes']))
+        unique_n_dict = {'nodes': [{'name': 'node1'}, {'name': 'gene1'}]}
+        self.assertEqual(indraobj._get_cache_file(n_dict=n_dict),
+                         indraobj._get_cache_file(n_dict=unique_n_dict))
+
+        # result saved by annotate_network is used by direct query
+        indraobj.annotate_network(net_cx=net)
+        self.assertEqual(1, indraobj.query_indra.call_count)
+        self.assertEqual([os.path.basename(indraobj._get_cache_file(n_dict=n_dict))],
+                         os.listdir(temp_dir))
+        res = indraobj._get_indra_result(net_cx=net)
+        self.assertEqual(({'edges': []}, 0), res)
+        self.assertEqual(1, indraobj.query_indra.call_count)
+
+    def test_json_loads(self):
+        self.assertEqual({'a': [1, 2]}, indra.json_loads(b'{"a": [1, 2]}'))
+        self.assertEqual({'a': [1, 2]}, indra.json_loads('{"a": [1, 2]}'))
+
+    def test_write_file_atomically(self):
+        temp_dir = self._get_temp_dir()
+        outfile = os.path.join(temp_dir, 'foo.json')
+        indra.write_file_atomically(outfile, b'{"a": 1}')
+        indra.write_file_atomically(outfile, b'{"a": 2}')
+        self.assertEqual(['foo.json'], os.listdir(temp_dir))
+        with open(outfile, 'rb') as f:
+            self.assertEqual(b'{"a": 2}', f.read())
+
+    def test_load_json_cache_file(self):
+        temp_dir = self._get_temp_dir()
+        cachefile = os.path.join(temp_dir, 'foo.json')
+        with open(cachefile, 'w') as f:
+            f.write('{"a": 1}')
+        self.assertEqual({'a': 1}, indra.load_json_cache_file(cachefile))
+
+        # truncated file should be removed
+        with open(cachefile, 'w') as f:
+            f.write('{"a": ')
+        self.assertIsNone(indra.load_json_cache_file(cachefile))
+        self.assertFalse(os.path.isfile(cachefile))
+
     def test_annotate_with_ephb_network_and_cached_indra_res(self):
         net = ndex2.create_nice_cx_from_file(TestIndra.EPHB_FORWARDING_CX)
 
-        with open(TestIndra.EPHB_FORWARDING_INDRA, 'r') as f:
-            indrares = json.load(f)
+        indrares = TestIndra._ephb_indrares
+        orig_indrares = copy.deepcopy(indrares)
 
-        indraobj = Indra()
+        indraobj = TestIndra._indra
         res_cx, result = indraobj.annotate_network(net_cx=net,
                                                    indraresult=indrares,
                                                    source_value='NCI PID')
@@ -239,7 +487,7 @@ class TestIndra(unittest.TestCase):
         self.assertTrue('using <a href="https://www.indra.bio" '
                         'target="INDRA_Evidence">INDRA service</a>' in desc)
         self.assertEqual(42, len(res_cx.get_nodes()))
-        self.assertEqual(541, len(res_cx.get_edges()))
+        self.assertEqual(541, len(res_cx.edges))
 
         name_to_id_dict = indra.get_node_name_to_id_dict(res_cx)
 
@@ -260,6 +508,47 @@ class TestIndra(unittest.TestCase):
         self.assertTrue('RAP1A binds RAP1B(' in src_to_tar['v'])
         self.assertTrue('RAP1A inhibits RAP1B(' in src_to_tar['v'])
 
+        # INDRA result passed in should not be modified
+        self.assertEqual(orig_indrares, indrares)
+
+    def test_annotate_with_ephb_network_parallel(self):
+        net = ndex2.create_nice_cx_from_file(TestIndra.EPHB_FORWARDING_CX)
+        indrares = copy.deepcopy(TestIndra._ephb_indrares)
+        serial_cx, result = TestIndra._indra.annotate_network(net_cx=net,
+                                                              indraresult=indrares)
+
+        # EPHB network is below PARALLEL_MIN_EDGES so lower
+        # the threshold to force use of process pool
+        net = ndex2.create_nice_cx_from_file(TestIndra.EPHB_FORWARDING_CX)
+        indrares = copy.deepcopy(TestIndra._ephb_indrares)
+        with patch.object(Indra, 'PARALLEL_MIN_EDGES', 1):
+            par_cx, result = TestIndra._indra.annotate_network(net_cx=net,
+                                                               indraresult=indrares,
+                                                               parallel=True,
+                                                               max_workers=2)
+        self.assertEqual(len(serial_cx.edges), len(par_cx.edges))
+        for edge_id, edge_obj in serial_cx.get_edges():
+            self.assertEqual(serial_cx.get_edge_attributes(edge_id),
+                             par_cx.get_edge_attributes(edge_id))
+
+    def test_annotate_parallel_below_min_edges_runs_serially(self):
+        net = ndex2.create_nice_cx_from_file(TestIndra.EPHB_FORWARDING_CX)
+        with patch('ndexindraloader.indra.ProcessPoolExecutor') as mockpool:
+            TestIndra._indra.annotate_network(net_cx=net,
+                                              indraresult=TestIndra._ephb_indrares,
+                                              parallel=True)
+            mockpool.assert_not_called()
+
+    def test_get_edge_payload_module_function(self):
+        stmt_list = [{'stmt_type': 'Activation', 'english': 'A activates B.',
+                      'evidence_count': 3, 'stmt_hash': 1,
+                      'isreversed': False, 'source_node': 'A',
+                      'target_node': 'B'}]
+        indraobj = Indra(default_browser_target='foo')
+        self.assertEqual(indraobj._get_edge_payload(copy.deepcopy(stmt_list)),
+                         indra._get_edge_payload(copy.deepcopy(stmt_list),
+                                                 browser_target='foo'))
+
     def test_statement_filter_base_class(self):
         filter = StatementFilter()
         try:
@@ -4,18 +4,10 @@
 """Tests for `MedscanStatementFilter` package."""
 
 import os
-import json
-import tempfile
-import shutil
 
 import unittest
-from unittest.mock import MagicMock
-from ndex2.nice_cx_network import NiceCXNetwork
-import ndex2
-from ndexindraloader.exceptions import NDExIndraLoaderError
-from ndexindraloader.indra import Indra
-from ndexindraloader import indra
 from ndexindraloader.indra import MedscanStatementFilter
+from tests._fixtures import load_indra_result
 
 
 class TestMedscanStatementFilter(unittest.TestCase):
@@ -29,6 +21,11 @@ class TestMedscanStatementFilter(unittest.TestCase):
                                          '01c81f4a-6192-11e5-8ac5-06603eb7f'
                                          '303.json')
 
+    @classmethod
+    def setUpClass(cls):
+        """Loads INDRA result for EPHB network once for all tests"""
+        cls._ephb_indrares = load_indra_result(cls.EPHB_FORWARDING_INDRA)
+
     def setUp(self):
         """Set up test fixtures, if any."""
 
@@ -84,15 +81,14 @@ class TestMedscanStatementFilter(unittest.TestCase):
 
     def test_filter_on_ephb(self):
         filter = MedscanStatementFilter()
-        with open(TestMedscanStatementFilter.EPHB_FORWARDING_INDRA,
-                  'r') as f:
-            indrares = json.load(f)
-        for raw_edge_evidence in indrares['edges']:
-            edge_evidence, report = filter.filter(raw_edge_evidence)
-            if len(report) == 0:
-                self.assertEqual(raw_edge_evidence, edge_evidence)
-            else:
-                self.assertNotEqual(raw_edge_evidence, edge_evidence)
+        indrares = TestMedscanStatementFilter._ephb_indrares
+        for idx, raw_edge_evidence in enumerate(indrares['edges']):
+            with self.subTest(edge=idx):
+                edge_evidence, report = filter.filter(raw_edge_evidence)
+                if len(report) == 0:
+                    self.assertIs(raw_edge_evidence, edge_evidence)
+                else:
+                    self.assertNotEqual(raw_edge_evidence, edge_evidence)
 
 
 
@@ -4,29 +4,60 @@
 """Tests for `ndexindraloader` package."""
 
 import os
+import argparse
 import json
 import tempfile
 import shutil
+import threading
+import time
 
 import unittest
 from unittest.mock import MagicMock
+from unittest.mock import patch
 from ndex2.nice_cx_network import NiceCXNetwork
 from ndexutil.config import NDExUtilConfig
 from ndexindraloader import ndexloadindra
 from ndexindraloader.ndexloadindra import NDExIndraLoader
 from ndexindraloader.exceptions import NDExIndraLoaderError
-from ndexindraloader.indra import Indra
 
 
 class TestNdexindraloader(unittest.TestCase):
     """Tests for `ndexindraloader` package."""
 
+    SINGLE_NODE_CX = '[{"numberVerification": [{"longNumber": 281474976710655}]},' \
+                     '{"metaData": [{"name": "nodes", "elementCount": 1,' \
+                     '"idCounter": 0, "version": "1.0"}]},' \
+                     '{"nodes": [{"@id": 0, "n": "node1"}]},' \
+                     '{"status": [{"error": "", "success": true}]}]'
+    """
+    CX for network with a single node named node1
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        """Creates one temp directory shared by all tests"""
+        cls._temp_root = tempfile.mkdtemp()
+
+    @classmethod
+    def tearDownClass(cls):
+        """Removes temp directory shared by all tests"""
+        shutil.rmtree(cls._temp_root)
+
     def setUp(self):
         """Set up test fixtures, if any."""
 
     def tearDown(self):
         """Tear down test fixtures, if any."""
 
+    def _get_temp_dir(self):
+        """
+        Creates an empty directory for the current test under
+        the temp directory shared by this class
+        """
+        temp_dir = os.path.join(self._temp_root, self.id().split('.')[-1])
+        os.mkdir(temp_dir)
+        return temp_dir
+
     def test_parse_arguments(self):
         """Tests parse arguments"""
         res = ndexloadindra._parse_arguments('hi', ['input'])
@@ -59,11 +90,10 @@ class TestNdexindraloader(unittest.TestCase):
         ndexloadindra._setup_logging(res)
 
         # args.logconf set to a file
-        try:
-            temp_dir = tempfile.mkdtemp()
+        temp_dir = self._get_temp_dir()
 
-            logfile = os.path.join(temp_dir, 'log.conf')
-            with open(logfile, 'w') as f:
+        logfile = os.path.join(temp_dir, 'log.conf')
+        with open(logfile, 'w') as f:
                 f.write("""[loggers]
 keys=root
 
@@ -86,45 +116,171 @@ args=(sys.stderr,)
 [formatter_formatter]
 format=%(asctime)s %(name)-12s %(levelname)-8s %(message)s""")
 
-            res = ndexloadindra._parse_arguments('hi', ['--logconf',
-                                                        logfile, 'input'])
-            ndexloadindra._setup_logging(res)
-
-        finally:
-            shutil.rmtree(temp_dir)
+        res = ndexloadindra._parse_arguments('hi', ['--logconf',
+                                                    logfile, 'input'])
+        ndexloadindra._setup_logging(res)
 
     def test_main(self):
         """Tests main function"""
 
         # try where loading config is successful
+        temp_dir = self._get_temp_dir()
+        confile = os.path.join(temp_dir, 'some.conf')
+        with open(confile, 'w') as f:
+            f.write("""[hi]
+            {user} = bob
+            {pw} = smith
+            {server} = dev.ndexbio.org
+            {destuser} = destbob
+            {destpass} = destpass
+            {destserver} = test.ndexbio.org""".format(user=NDExUtilConfig.USER,
+                                                      pw=NDExUtilConfig.PASSWORD,
+                                                      server=NDExUtilConfig.SERVER,
+                                                      destuser=NDExIndraLoader.DEST_USER,
+                                                      destpass=NDExIndraLoader.DEST_PASSWORD,
+                                                      destserver=NDExIndraLoader.DEST_SERVER))
+        res = ndexloadindra.main(['myprog.py',
+                                  '--conf',
+                                  confile, '--profile',
+                                  'hi', 'input'])
+        self.assertEqual(res, 2)
+
+    def test_constructor_defaults_for_missing_args(self):
+        args = argparse.Namespace(conf=None, profile=None)
+        loader = NDExIndraLoader(args, py4cyto=MagicMock(),
+                                 ndexextra=MagicMock())
+        self.assertEqual('PUBLIC', loader._visibility)
+        self.assertEqual('ALL', loader._indexlevel)
+        self.assertTrue(loader._showcase)
+
+    def test_apply_cytoscape_layout_removes_tmp_files_on_error(self):
+        temp_dir = self._get_temp_dir()
+        mockargs = MagicMock()
+        mockargs.tmpdir = temp_dir
+
+        def fake_annotate(cxfile=None, outcxfile=None):
+            shutil.copyfile(cxfile, outcxfile)
+
+        ndexextra = MagicMock()
+        ndexextra.add_node_id_as_node_attribute = MagicMock(side_effect=fake_annotate)
+        py4 = MagicMock()
+        py4.import_network_from_file = MagicMock(return_value={})
+        loader = NDExIndraLoader(mockargs, py4cyto=py4,
+                                 ndexextra=ndexextra)
+        net = NiceCXNetwork()
+        net.create_node('node1')
         try:
-            temp_dir = tempfile.mkdtemp()
-            confile = os.path.join(temp_dir, 'some.conf')
-            with open(confile, 'w') as f:
-                f.write("""[hi]
-                {user} = bob
-                {pw} = smith
-                {server} = dev.ndexbio.org
-                {destuser} = destbob
-                {destpass} = destpass
-                {destserver} = test.ndexbio.org""".format(user=NDExUtilConfig.USER,
-                                                          pw=NDExUtilConfig.PASSWORD,
-                                                          server=NDExUtilConfig.SERVER,
-                                                          destuser=NDExIndraLoader.DEST_USER,
-                                                          destpass=NDExIndraLoader.DEST_PASSWORD,
-                                                          destserver=NDExIndraLoader.DEST_SERVER))
-            res = ndexloadindra.main(['myprog.py',
-                                      '--conf',
-                                      confile, '--profile',
-                                      'hi', 'input'])
-            self.assertEqual(res, 2)
-        finally:
-            shutil.rmtree(temp_dir)
+            loader._apply_cytoscape_layout(net)
+            self.fail('Expected NDExIndraLoaderError')
+        except NDExIndraLoaderError as e:
+            self.assertTrue('network view could not' in str(e))
+        self.assertEqual([], os.listdir(temp_dir))
+
+    def test_should_apply_layout(self):
+        mockargs = MagicMock()
+        mockargs.layout = None
+        mockargs.force_layout = False
+        loader = NDExIndraLoader(mockargs)
+        net = NiceCXNetwork()
+        net.create_node('node1')
+        self.assertFalse(loader._should_apply_layout(net))
+
+        mockargs.layout = 'spring'
+        self.assertTrue(loader._should_apply_layout(net))
+
+        net.set_opaque_aspect('cartesianLayout', [{'node': 0,
+                                                   'x': 1.0,
+                                                   'y': 2.0}])
+        self.assertFalse(loader._should_apply_layout(net))
+
+        mockargs.force_layout = True
+        self.assertTrue(loader._should_apply_layout(net))
+
+    def test_write_cx_to_file(self):
+        temp_dir = self._get_temp_dir()
+        mynet = NiceCXNetwork()
+        mynet.set_name('foo')
+        node_one = mynet.create_node('node1')
+        node_two = mynet.create_node('node2')
+        mynet.create_edge(edge_source=node_one, edge_target=node_two,
+                          edge_interaction='binds')
+        outcxfile = os.path.join(temp_dir, 'foo.cx')
+        ndexloadindra.write_cx_to_file(mynet.to_cx(), outcxfile)
+        with open(outcxfile, 'r') as f:
+            res = json.load(f)
+        self.assertEqual(mynet.to_cx(), res)
+
+    def test_load_cx_file(self):
+        temp_dir = self._get_temp_dir()
+        mynet = NiceCXNetwork()
+        mynet.set_name('foo')
+        node_one = mynet.create_node('node1')
+        node_two = mynet.create_node('node2')
+        mynet.create_edge(edge_source=node_one, edge_target=node_two,
+                          edge_interaction='binds')
+        cxfile = os.path.join(temp_dir, 'foo.cx')
+        ndexloadindra.write_cx_to_file(mynet.to_cx(), cxfile)
+        res = ndexloadindra._load_cx_file(cxfile)
+        self.assertEqual('foo', res.get_name())
+        self.assertEqual(2, len(res.get_nodes()))
+        self.assertEqual(1, len(res.get_edges()))
+
+    def test_prefetch(self):
+        self.assertEqual([], list(ndexloadindra._prefetch([])))
+        self.assertEqual(list(range(10)),
+                         list(ndexloadindra._prefetch(iter(range(10)))))
+        self.assertEqual(list(range(10)),
+                         list(ndexloadindra._prefetch(range(10), size=3)))
+
+    def test_prefetch_raises_error_from_iterable(self):
+        def gen():
+            yield 1
+            raise NDExIndraLoaderError('some error')
+
+        res = []
+        try:
+            for item in ndexloadindra._prefetch(gen()):
+                res.append(item)
+            self.fail('Expected NDExIndraLoaderError')
+        except NDExIndraLoaderError as e:
+            self.assertEqual('some error', str(e))
+        self.assertEqual([1], res)
+
+    def test_prefetch_stops_early(self):
+        fetched = []
+
+        def gen():
+            for i in range(100):
+                fetched.append(i)
+                yield i
+
+        prefetcher = ndexloadindra._prefetch(gen())
+        self.assertEqual(0, next(prefetcher))
+        prefetcher.close()
+        self.assertTrue(len(fetched) < 100)
+
+    def test_gate(self):
+        semaphore = threading.BoundedSemaphore(2)
+        gated = ndexloadindra._gate(range(3), semaphore)
+        self.assertEqual(0, next(gated))
+        self.assertEqual(1, next(gated))
+
+        # both slots are in use so next item is not fetched
+        self.assertFalse(semaphore.acquire(blocking=False))
+        semaphore.release()
+        self.assertEqual(2, next(gated))
+        semaphore.release()
+        semaphore.release()
+
+        # slot acquired for end of iteration should be given back
+        self.assertEqual([], list(gated))
+        self.assertTrue(semaphore.acquire(blocking=False))
+        self.assertTrue(semaphore.acquire(blocking=False))
 
     def test_get_next_network_from_input_invalid(self):
 
+        temp_dir = self._get_temp_dir()
         try:
-            temp_dir = tempfile.mkdtemp()
             nonexistantfile = os.path.join(temp_dir, 'doesnotexist')
 
             # what is interesting here is if i omit a,b,c= this method
@@ -135,206 +291,265 @@ format=%(asctime)s %(name)-12s %(levelname)-8s %(message)s""")
             self.assertEqual('Input must be a CX file ending with .cx or '
                              'a file with NDEx Network UUID one per line',
                              str(e))
-        finally:
-            shutil.rmtree(temp_dir)
 
     def test_get_next_network_from_input_single_cxfile(self):
 
-        try:
-            temp_dir = tempfile.mkdtemp()
-            mynet = NiceCXNetwork()
-
-            mynet.create_node('node1')
-            outcxfile = os.path.join(temp_dir, 'foo.cx')
-            with open(outcxfile, 'w') as f:
-                json.dump(mynet.to_cx(), f)
-                f.flush()
-
-            for net_cx, file_name, cache_file in ndexloadindra.get_next_network_from_input(outcxfile):
-                self.assertEqual(None, cache_file)
-                self.assertEqual('foo.cx', file_name)
-                self.assertEqual(1, len(net_cx.get_nodes()))
-        finally:
-            shutil.rmtree(temp_dir)
+        temp_dir = self._get_temp_dir()
+        outcxfile = os.path.join(temp_dir, 'foo.cx')
+        with open(outcxfile, 'w') as f:
+            f.write(TestNdexindraloader.SINGLE_NODE_CX)
+
+        for net_cx, file_name, cache_file in ndexloadindra.get_next_network_from_input(outcxfile):
+            self.assertEqual(None, cache_file)
+            self.assertEqual('foo.cx', file_name)
+            self.assertEqual(1, len(net_cx.get_nodes()))
 
     def test_get_next_network_from_input_single_cxfile_withcache(self):
 
-        try:
-            temp_dir = tempfile.mkdtemp()
-            mynet = NiceCXNetwork()
-
-            mynet.create_node('node1')
-            outcxfile = os.path.join(temp_dir, 'foo.cx')
-            with open(outcxfile, 'w') as f:
-                json.dump(mynet.to_cx(), f)
-                f.flush()
-
-            cachedir = os.path.join(temp_dir, 'cache')
-            os.makedirs(cachedir, mode=0o755)
-            thecachefile = os.path.join(cachedir, 'foo.cx.json')
-            with open(thecachefile, 'w') as f:
-                f.write('{}\n')
-                f.flush()
-
-            for net_cx, file_name, cache_file in ndexloadindra.get_next_network_from_input(outcxfile,
-                                                                                           cachedir=cachedir):
-                self.assertEqual(thecachefile, cache_file)
-                self.assertEqual('foo.cx', file_name)
-                self.assertEqual(1, len(net_cx.get_nodes()))
-        finally:
-            shutil.rmtree(temp_dir)
+        temp_dir = self._get_temp_dir()
+        outcxfile = os.path.join(temp_dir, 'foo.cx')
+        with open(outcxfile, 'w') as f:
+            f.write(TestNdexindraloader.SINGLE_NODE_CX)
+
+        cachedir = os.path.join(temp_dir, 'cache')
+        os.makedirs(cachedir, mode=0o755)
+        thecachefile = os.path.join(cachedir, 'foo.cx.json')
+        with open(thecachefile, 'w') as f:
+            f.write('{}\n')
+            f.flush()
+
+        for net_cx, file_name, cache_file in ndexloadindra.get_next_network_from_input(outcxfile,
+                                                                                       cachedir=cachedir):
+            self.assertEqual(thecachefile, cache_file)
+            self.assertEqual('foo.cx', file_name)
+            self.assertEqual(1, len(net_cx.get_nodes()))
 
     def test_get_next_network_from_input_file_of_two_uuids(self):
 
-        try:
+        temp_dir = self._get_temp_dir()
+        id_one = 'd2c3f73b-7d9c-4012-9dd6-08a159077439'
+        id_two = '68e860d4-e6ed-49da-ba0b-5fb412108959'
+        mynet = NiceCXNetwork()
+        mynet.create_node('node1')
+
+        mynet2 = NiceCXNetwork()
+        mynet2.create_node('node2')
+
+        uuidlist = os.path.join(temp_dir, 'foo.txt')
+        with open(uuidlist, 'w') as f:
+            f.write('tooshorttobeid\n')
+            f.write(id_one + '\n')
+            f.write(id_two + '\n')
+            f.flush()
+
+        cachedir = os.path.join(temp_dir, 'cache')
+        os.makedirs(cachedir, mode=0o755)
+        thecachefile = os.path.join(cachedir, id_one + '.json')
+        with open(thecachefile, 'w') as f:
+            f.write('{}\n')
+            f.flush()
+
+        ndexmock = MagicMock()
+        ndexmock.create_nice_cx_from_server = MagicMock(side_effect=[mynet, mynet2])
+
+        gen_rator = ndexloadindra.get_next_network_from_input(uuidlist,
+                                                              cachedir=cachedir,
+                                                              ndexobj=ndexmock)
+
+        net_cx, file_name, cache_file = next(gen_rator)
+
+        self.assertEqual(thecachefile, cache_file)
+        self.assertEqual(id_one, file_name)
+        self.assertEqual(1, len(net_cx.get_nodes()))
+        self.assertEqual('node1', next(iter(net_cx.get_nodes()))[1]['n'])
+
+        net_cx, file_name, cache_file = next(gen_rator)
+        self.assertEqual(None, cache_file)
+        self.assertEqual(id_two, file_name)
+        self.assertEqual(1, len(net_cx.get_nodes()))
+        self.assertEqual('node2', next(iter(net_cx.get_nodes()))[1]['n'])
 
-            temp_dir = tempfile.mkdtemp()
-            id_one = 'd2c3f73b-7d9c-4012-9dd6-08a159077439'
-            id_two = '68e860d4-e6ed-49da-ba0b-5fb412108959'
-            mynet = NiceCXNetwork()
-            mynet.create_node('node1')
+        try:
+            next(gen_rator)
+            self.fail('Expected StopIteration')
+        except StopIteration:
+            pass
 
-            mynet2 = NiceCXNetwork()
-            mynet2.create_node('node2')
+        # a single client should be created and used for both downloads
+        ndexmock.client.Ndex2.assert_called_once_with(host=None,
+                                                      username=None,
+                                                      password=None)
+        the_client = ndexmock.client.Ndex2.return_value
+        for call in ndexmock.create_nice_cx_from_server.call_args_list:
+            self.assertIs(the_client, call[1]['ndex_client'])
 
-            uuidlist = os.path.join(temp_dir, 'foo.txt')
-            with open(uuidlist, 'w') as f:
-                f.write('tooshorttobeid\n')
-                f.write(id_one + '\n')
-                f.write(id_two + '\n')
-                f.flush()
 
-            cachedir = os.path.join(temp_dir, 'cache')
-            os.makedirs(cachedir, mode=0o755)
-            thecachefile = os.path.join(cachedir, id_one + '.json')
-            with open(thecachefile, 'w') as f:
-                f.write('{}\n')
-                f.flush()
+    def test_parse_config_all_set(self):
+        temp_dir = self._get_temp_dir()
+        mockargs = MagicMock()
+        mockargs.conf = os.path.join(temp_dir, 'conffile')
+        mockargs.profile='myprofile'
+        with open(mockargs.conf, 'w') as f:
+            f.write('[myprofile]\n')
+            f.write(NDExUtilConfig.USER + '=theuser\n')
+            f.write(NDExUtilConfig.PASSWORD + '=thepassword\n')
+            f.write(NDExUtilConfig.SERVER + '=theserver\n')
+            f.write(NDExIndraLoader.DEST_USER + '=destuser\n')
+            f.write(NDExIndraLoader.DEST_PASSWORD + '=destpassword\n')
+            f.write(NDExIndraLoader.DEST_SERVER + '=destserver\n')
 
-            ndexmock = MagicMock()
-            ndexmock.create_nice_cx_from_server = MagicMock(side_effect=[mynet, mynet2])
+        loader = NDExIndraLoader(mockargs)
+        loader._parse_config()
+        self.assertEqual('theuser', loader._user)
+        self.assertEqual('thepassword', loader._pass)
+        self.assertEqual('theserver', loader._server)
+        self.assertEqual('destuser', loader._dest_user)
+        self.assertEqual('destpassword', loader._dest_pass)
+        self.assertEqual('destserver', loader._dest_server)
+
+    def test_parse_config_reuses_parsed_config(self):
+        temp_dir = self._get_temp_dir()
+        mockargs = MagicMock()
+        mockargs.conf = os.path.join(temp_dir, 'conffile')
+        mockargs.profile='myprofile'
+        with open(mockargs.conf, 'w') as f:
+            f.write('[myprofile]\n')
+            f.write(NDExUtilConfig.USER + '=theuser\n')
+            f.write(NDExUtilConfig.PASSWORD + '=thepassword\n')
+            f.write(NDExUtilConfig.SERVER + '=theserver\n')
 
-            gen_rator = ndexloadindra.get_next_network_from_input(uuidlist,
-                                                                  cachedir=cachedir,
-                                                                  ndexobj=ndexmock)
+        loader = NDExIndraLoader(mockargs)
+        loader._parse_config()
+        hits = ndexloadindra._load_config_cached.cache_info().hits
+        loader = NDExIndraLoader(mockargs)
+        loader._parse_config()
+        self.assertEqual(hits + 1,
+                         ndexloadindra._load_config_cached.cache_info().hits)
+        self.assertEqual('theuser', loader._user)
+        self.assertEqual('thepassword', loader._pass)
+        self.assertEqual('theserver', loader._server)
 
-            net_cx, file_name, cache_file = next(gen_rator)
+    def test_parse_config_dest_omitted(self):
+        temp_dir = self._get_temp_dir()
+        mockargs = MagicMock()
+        mockargs.conf = os.path.join(temp_dir, 'conffile')
+        mockargs.profile='myprofile'
+        with open(mockargs.conf, 'w') as f:
+            f.write('[myprofile]\n')
+            f.write(NDExUtilConfig.USER + '=theuser\n')
+            f.write(NDExUtilConfig.PASSWORD + '=thepassword\n')
+            f.write(NDExUtilConfig.SERVER + '=theserver\n')
 
-            self.assertEqual(thecachefile, cache_file)
-            self.assertEqual(id_one, file_name)
-            self.assertEqual(1, len(net_cx.get_nodes()))
-            self.assertEqual('node1', list(net_cx.get_nodes())[0][1]['n'])
+        loader = NDExIndraLoader(mockargs)
+        loader._parse_config()
+        self.assertEqual('theuser', loader._user)
+        self.assertEqual('thepassword', loader._pass)
+        self.assertEqual('theserver', loader._server)
+        self.assertEqual('theuser', loader._dest_user)
+        self.assertEqual('thepassword', loader._dest_pass)
+        self.assertEqual('theserver', loader._dest_server)
 
-            net_cx, file_name, cache_file = next(gen_rator)
-            self.assertEqual(None, cache_file)
-            self.assertEqual(id_two, file_name)
-            self.assertEqual(1, len(net_cx.get_nodes()))
-            self.assertEqual('node2', list(net_cx.get_nodes())[0][1]['n'])
+    def test_load_style_template(self):
+        temp_dir = self._get_temp_dir()
+        mockargs =MagicMock()
+        mockargs.style = os.path.join(temp_dir, 'style.cx')
+        loader = NDExIndraLoader(mockargs)
+        loader._load_style_template()
 
-            try:
-                next(gen_rator)
-                self.fail('Expected StopIteration')
-            except StopIteration:
-                pass
+        # try loader where style file is missing
+        self.assertEqual(None, loader._template)
 
-        finally:
-            shutil.rmtree(temp_dir)
+        net = NiceCXNetwork()
+        net.set_name('style network')
+        with open(mockargs.style, 'w') as f:
+            json.dump(net.to_cx(), f)
 
-    def test_parse_config_all_set(self):
-        try:
-            temp_dir = tempfile.mkdtemp()
-            mockargs = MagicMock()
-            mockargs.conf = os.path.join(temp_dir, 'conffile')
-            mockargs.profile='myprofile'
-            with open(mockargs.conf, 'w') as f:
-                f.write('[myprofile]\n')
-                f.write(NDExUtilConfig.USER + '=theuser\n')
-                f.write(NDExUtilConfig.PASSWORD + '=thepassword\n')
-                f.write(NDExUtilConfig.SERVER + '=theserver\n')
-                f.write(NDExIndraLoader.DEST_USER + '=destuser\n')
-                f.write(NDExIndraLoader.DEST_PASSWORD + '=destpassword\n')
-                f.write(NDExIndraLoader.DEST_SERVER + '=destserver\n')
-
-            loader = NDExIndraLoader(mockargs)
-            loader._parse_config()
-            self.assertEqual('theuser', loader._user)
-            self.assertEqual('thepassword', loader._pass)
-            self.assertEqual('theserver', loader._server)
-            self.assertEqual('destuser', loader._dest_user)
-            self.assertEqual('destpassword', loader._dest_pass)
-            self.assertEqual('destserver', loader._dest_server)
-        finally:
-            shutil.rmtree(temp_dir)
+        loader._load_style_template()
+        self.assertEqual('style network', loader._template.get_name())
 
-    def test_parse_config_dest_omitted(self):
-        try:
-            temp_dir = tempfile.mkdtemp()
-            mockargs = MagicMock()
-            mockargs.conf = os.path.join(temp_dir, 'conffile')
-            mockargs.profile='myprofile'
-            with open(mockargs.conf, 'w') as f:
-                f.write('[myprofile]\n')
-                f.write(NDExUtilConfig.USER + '=theuser\n')
-                f.write(NDExUtilConfig.PASSWORD + '=thepassword\n')
-                f.write(NDExUtilConfig.SERVER + '=theserver\n')
-
-            loader = NDExIndraLoader(mockargs)
-            loader._parse_config()
-            self.assertEqual('theuser', loader._user)
-            self.assertEqual('thepassword', loader._pass)
-            self.assertEqual('theserver', loader._server)
-            self.assertEqual('theuser', loader._dest_user)
-            self.assertEqual('thepassword', loader._dest_pass)
-            self.assertEqual('theserver', loader._dest_server)
-        finally:
-            shutil.rmtree(temp_dir)
+    def test_load_style_template_reused_until_file_changes(self):
+        temp_dir = self._get_temp_dir()
+        mockargs = MagicMock()
+        mockargs.style = os.path.join(temp_dir, 'style.cx')
+        net = NiceCXNetwork()
+        net.set_name('style network')
+        with open(mockargs.style, 'w') as f:
+            json.dump(net.to_cx(), f)
 
-    def test_load_style_template(self):
-        try:
-            temp_dir =tempfile.mkdtemp()
-            mockargs =MagicMock()
-            mockargs.style = os.path.join(temp_dir, 'style.cx')
-            loader = NDExIndraLoader(mockargs)
-            loader._load_style_template()
+        loader = NDExIndraLoader(mockargs)
+        loader._load_style_template()
+        template = loader._template
 
-            # try loader where style file is missing
-            self.assertEqual(None, loader._template)
+        # another loader should get the already parsed template
+        loader = NDExIndraLoader(mockargs)
+        loader._load_style_template()
+        self.assertIs(template, loader._template)
+
+        # updating the file should cause it to be parsed again
+        net.set_name('new style network')
+        with open(mockargs.style, 'w') as f:
+            json.dump(net.to_cx(), f)
+        mtime = os.path.getmtime(mockargs.style)
+        os.utime(mockargs.style, (mtime + 10, mtime + 10))
+        loader._load_style_template()
+        self.assertIsNot(template, loader._template)
+        self.assertEqual('new style network', loader._template.get_name())
+
+    def test_load_style_template_default(self):
+        mockargs = MagicMock()
+        mockargs.style = None
+        loader = NDExIndraLoader(mockargs)
+        loader._load_style_template()
+        self.assertEqual(os.path.join(os.path.dirname(ndexloadindra.__file__),
+                                      'style.cx'), mockargs.style)
+        self.assertIsNotNone(loader._template)
+
+    def test_get_curation_list_from_file(self):
+        temp_dir = self._get_temp_dir()
+        curfile = os.path.join(temp_dir, 'curations.json')
+        curations = [{'pa_hash': 123, 'tag': 'incorrect'}]
+        with open(curfile, 'w') as f:
+            json.dump(curations, f)
+        loader = NDExIndraLoader(MagicMock())
+        res = loader._get_curation_list(curfile)
+        self.assertEqual(curations, res)
 
-            net = NiceCXNetwork()
-            net.set_name('style network')
-            with open(mockargs.style, 'w') as f:
-                json.dump(net.to_cx(), f)
+        # file is unchanged so same parsed result should be returned
+        self.assertIs(res, loader._get_curation_list(curfile))
 
-            loader._load_style_template()
-            self.assertEqual('style network', loader._template.get_name())
-        finally:
-            shutil.rmtree(temp_dir)
+    def test_get_curation_list_none(self):
+        loader = NDExIndraLoader(MagicMock())
+        self.assertIsNone(loader._get_curation_list(None))
 
     def test_create_saveasfile_dir(self):
-        try:
-            temp_dir = tempfile.mkdtemp()
-            mockargs = MagicMock()
-            mockargs.saveasfile = os.path.join(temp_dir, 'saveasdir')
-            loader = NDExIndraLoader(mockargs)
-            res = loader._create_saveasfile_dir()
-            self.assertIsNotNone(res)
-            self.assertTrue(os.path.isdir(res))
-            self.assertTrue(os.path.isdir(mockargs.saveasfile))
-        finally:
-            shutil.rmtree(temp_dir)
+        temp_dir = self._get_temp_dir()
+        mockargs = MagicMock()
+        mockargs.saveasfile = os.path.join(temp_dir, 'saveasdir')
+        loader = NDExIndraLoader(mockargs)
+        res = loader._create_saveasfile_dir()
+        self.assertIsNotNone(res)
+        self.assertTrue(os.path.isdir(res))
+        self.assertTrue(os.path.isdir(mockargs.saveasfile))
+
+        # second call should return cached path without checking directory
+        with patch('ndexindraloader.ndexloadindra.os.path.isdir') as mockisdir:
+            self.assertEqual(res, loader._create_saveasfile_dir())
+            mockisdir.assert_not_called()
 
     def test_create_indracache(self):
-        try:
-            temp_dir = tempfile.mkdtemp()
-            mockargs = MagicMock()
-            mockargs.indracachedir = os.path.join(temp_dir, 'cachedir')
-            loader = NDExIndraLoader(mockargs)
-            res = loader._create_indracache()
-            self.assertIsNotNone(res)
-            self.assertTrue(os.path.isdir(res))
-            self.assertTrue(os.path.isdir(mockargs.indracachedir))
-        finally:
-            shutil.rmtree(temp_dir)
+        temp_dir = self._get_temp_dir()
+        mockargs = MagicMock()
+        mockargs.indracachedir = os.path.join(temp_dir, 'cachedir')
+        loader = NDExIndraLoader(mockargs)
+        res = loader._create_indracache()
+        self.assertIsNotNone(res)
+        self.assertTrue(os.path.isdir(res))
+        self.assertTrue(os.path.isdir(mockargs.indracachedir))
+
+        # second call should return cached path without checking directory
+        with patch('ndexindraloader.ndexloadindra.os.path.isdir') as mockisdir:
+            self.assertEqual(res, loader._create_indracache())
+            mockisdir.assert_not_called()
 
     def test_cartesian(self):
         mocknet = MagicMock()
@@ -348,6 +563,23 @@ format=%(asctime)s %(name)-12s %(levelname)-8s %(message)s""")
         self.assertEqual(3.0, res[1]['x'])
         self.assertEqual(-4.0, res[1]['y'])
 
+    def test_cartesian_numpy_positions(self):
+        import numpy as np
+        mocknet = MagicMock()
+        mocknet.pos = {5: np.array([0.5, -1.5]), 7: np.array([2.0, 3.0])}
+        loader = NDExIndraLoader(MagicMock())
+        res = loader._cartesian(mocknet)
+        self.assertEqual([{'node': 5, 'x': 0.5, 'y': 1.5},
+                          {'node': 7, 'x': 2.0, 'y': -3.0}], res)
+        self.assertIs(float, type(res[0]['x']))
+        self.assertIs(float, type(res[0]['y']))
+
+    def test_cartesian_empty(self):
+        mocknet = MagicMock()
+        mocknet.pos = {}
+        loader = NDExIndraLoader(MagicMock())
+        self.assertEqual([], loader._cartesian(mocknet))
+
     def test_apply_simple_spring_layout(self):
         mockargs = MagicMock()
         loader = NDExIndraLoader(mockargs)
@@ -361,4 +593,154 @@ format=%(asctime)s %(name)-12s %(levelname)-8s %(message)s""")
         layout_aspect = net.get_opaque_aspect('cartesianLayout')
         self.assertEqual(2, len(layout_aspect))
 
+    def test_apply_simple_spring_layout_with_num_nodes(self):
+        mockargs = MagicMock()
+        loader = NDExIndraLoader(mockargs)
+
+        net = NiceCXNetwork()
+        node_one = net.create_node('node1')
+        node_two = net.create_node('node2')
+        net.create_edge(edge_source=node_one, edge_target=node_two)
+        loader._apply_simple_spring_layout(net, iterations=2,
+                                           num_nodes=2)
 
+        layout_aspect = net.get_opaque_aspect('cartesianLayout')
+        self.assertEqual(2, len(layout_aspect))
+        self.assertEqual({node_one, node_two},
+                         {entry['node'] for entry in layout_aspect})
+
+    def _get_networks(self, num_networks, num_nodes=1):
+        """
+        Creates **num_networks** tuples in format yielded by
+        :py:func:`get_next_network_from_input`
+        """
+        net_tuples = []
+        for net_index in range(num_networks):
+            net = NiceCXNetwork()
+            net.set_name('net' + str(net_index))
+            for node_index in range(num_nodes):
+                net.create_node('node' + str(node_index))
+            net_tuples.append((net, 'net' + str(net_index), None))
+        return net_tuples
+
+    def _run_loader(self, temp_dir, net_tuples, extra_args=None,
+                    annotate_side_effect=None):
+        """
+        Runs :py:meth:`NDExIndraLoader.run` on **net_tuples** with
+        INDRA annotation and Cytoscape layout mocked out
+
+        :return: (loader, mock tqdm progress bar, mock cytoscape layout)
+        """
+        outdir = os.path.join(temp_dir, 'out')
+        confile = os.path.join(temp_dir, 'conffile')
+        with open(confile, 'w') as f:
+            f.write('[myprofile]\n')
+            f.write(NDExUtilConfig.USER + '=theuser\n')
+            f.write(NDExUtilConfig.PASSWORD + '=thepassword\n')
+            f.write(NDExUtilConfig.SERVER + '=theserver\n')
+        args = ['input', '--conf', confile, '--profile', 'myprofile',
+                '--saveasfile', outdir, '--layout', 'force-directed',
+                '--disable_tqdm']
+        if extra_args is not None:
+            args.extend(extra_args)
+        pargs = ndexloadindra._parse_arguments('hi', args)
+        loader = NDExIndraLoader(pargs, py4cyto=MagicMock(),
+                                 ndexextra=MagicMock())
+
+        if annotate_side_effect is None:
+            def annotate_side_effect(net_cx=None, **kwargs):
+                return net_cx, {'edges': []}
+
+        locked = []
+
+        def fake_cytoscape_layout(network):
+            locked.append(loader._cytoscape_lock.locked())
+
+        loader._apply_cytoscape_layout = MagicMock(side_effect=fake_cytoscape_layout)
+        with patch('ndexindraloader.ndexloadindra.get_next_network_from_input',
+                   return_value=iter(net_tuples)),\
+                patch('ndexindraloader.ndexloadindra.Indra.annotate_network',
+                      side_effect=annotate_side_effect),\
+                patch('tqdm.tqdm') as mocktqdm:
+            self.assertEqual(0, loader.run())
+        return loader, mocktqdm.return_value, locked
+
+    def test_run_with_jobs(self):
+        temp_dir = self._get_temp_dir()
+        net_tuples = self._get_networks(5)
+        loader, t_progress, locked = self._run_loader(temp_dir, net_tuples,
+                                                      extra_args=['--jobs', '3'])
+        outdir = os.path.join(temp_dir, 'out')
+        self.assertEqual(sorted(n[1] + '.cx' for n in net_tuples),
+                         sorted(os.listdir(outdir)))
+        self.assertEqual(5, t_progress.update.call_count)
+
+        # every cytoscape layout should run while holding the lock
+        self.assertEqual([True] * 5, locked)
+
+    def test_run_with_jobs_limits_networks_in_flight(self):
+        temp_dir = self._get_temp_dir()
+        net_tuples = self._get_networks(10)
+        counts_lock = threading.Lock()
+        counts = {'fetched': 0, 'done': 0, 'max_in_flight': 0}
+
+        def net_tuple_gen():
+            for net_tuple in net_tuples:
+                with counts_lock:
+                    counts['fetched'] += 1
+                    counts['max_in_flight'] = max(counts['max_in_flight'],
+                                                  counts['fetched'] -
+                                                  counts['done'])
+                yield net_tuple
+
+        def annotate_side_effect(net_cx=None, **kwargs):
+            time.sleep(0.01)
+            with counts_lock:
+                counts['done'] += 1
+            return net_cx, {'edges': []}
+
+        loader, t_progress, locked = self._run_loader(temp_dir,
+                                                      net_tuple_gen(),
+                                                      extra_args=['--jobs', '3'],
+                                                      annotate_side_effect=annotate_side_effect)
+        self.assertEqual(10, t_progress.update.call_count)
+        self.assertEqual(10, counts['fetched'])
+        self.assertTrue(counts['max_in_flight'] <= 3,
+                        str(counts['max_in_flight']) + ' networks in flight')
+
+    def test_run_with_jobs_skips_large_networks(self):
+        temp_dir = self._get_temp_dir()
+        net_tuples = self._get_networks(3)
+        big_net_tuples = self._get_networks(1, num_nodes=3)
+        big_net_tuples[0] = (big_net_tuples[0][0], 'bignet', None)
+        loader, t_progress, locked = self._run_loader(temp_dir,
+                                                      net_tuples + big_net_tuples,
+                                                      extra_args=['--jobs', '3',
+                                                                  '--maxnetworksize',
+                                                                  '2'])
+        outdir = os.path.join(temp_dir, 'out')
+        self.assertEqual(sorted(n[1] + '.cx' for n in net_tuples),
+                         sorted(os.listdir(outdir)))
+        self.assertEqual(3, t_progress.update.call_count)
+
+        self.assertFalse(loader._process_network(big_net_tuples[0],
+                                                 indra=MagicMock(),
+                                                 outdir=outdir))
+        self.assertFalse(os.path.isfile(os.path.join(outdir, 'bignet.cx')))
+
+    def test_run_with_jobs_error_in_worker(self):
+        temp_dir = self._get_temp_dir()
+        net_tuples = self._get_networks(5)
+
+        def annotate_side_effect(net_cx=None, **kwargs):
+            if net_cx.get_name() == 'net2':
+                raise NDExIndraLoaderError('annotate failed')
+            return net_cx, {'edges': []}
+
+        try:
+            self._run_loader(temp_dir, net_tuples,
+                             extra_args=['--jobs', '3'],
+                             annotate_side_effect=annotate_side_effect)
+            self.fail('Expected NDExIndraLoaderError')
+        except NDExIndraLoaderError as e:
+            self.assertEqual('annotate failed', str(e))
@@ -4,11 +4,11 @@
 """Tests for `SelfLoopStatementFilter` package."""
 
 import os
-import json
 
 
 import unittest
 from ndexindraloader.indra import SelfLoopStatementFilter
+from tests._fixtures import load_indra_result
 
 
 class TestSelfLoopStatementFilter(unittest.TestCase):
@@ -64,9 +64,25 @@ class TestSelfLoopStatementFilter(unittest.TestCase):
 
         res, report = filter.filter(edge_evidence)
         self.assertEqual('Removed 1 self loop statements\n', report)
+
+        # input should not be modified
+        self.assertEqual(2, len(edge_evidence['stmts']))
         del edge_evidence['stmts']['1']
         self.assertEqual(edge_evidence, res)
 
+    def test_filter_where_english_has_similar_words(self):
+        filter = SelfLoopStatementFilter()
+
+        edge_evidence = {'edge': [{'name': 'foo'},
+                                  {'name': 'foobar'}],
+                         'stmts': {'1': {'english': 'foo binds foobar.'},
+                                   '2': {'english': 'foo binds foo complex.'},
+                                   '3': {'english': 'foo activates.'}}}
+
+        res, report = filter.filter(edge_evidence)
+        self.assertEqual('Removed 1 self loop statements\n', report)
+        self.assertEqual({'1', '3'}, set(res['stmts'].keys()))
+
     def test_filter_where_all_stmts_good(self):
         filter = SelfLoopStatementFilter()
 
@@ -81,15 +97,14 @@ class TestSelfLoopStatementFilter(unittest.TestCase):
 
     def test_filter_on_ephb(self):
         filter = SelfLoopStatementFilter()
-        with open(TestSelfLoopStatementFilter.EPHB_FORWARDING_INDRA,
-                  'r') as f:
-            indrares = json.load(f)
-        for raw_edge_evidence in indrares['edges']:
-            edge_evidence, report = filter.filter(raw_edge_evidence)
-            if len(report) == 0:
-                self.assertEqual(raw_edge_evidence, edge_evidence)
-            else:
-                self.assertNotEqual(raw_edge_evidence, edge_evidence)
+        indrares = load_indra_result(TestSelfLoopStatementFilter.EPHB_FORWARDING_INDRA)
+        for idx, raw_edge_evidence in enumerate(indrares['edges']):
+            with self.subTest(edge=idx):
+                edge_evidence, report = filter.filter(raw_edge_evidence)
+                if len(report) == 0:
+                    self.assertIs(raw_edge_evidence, edge_evidence)
+                else:
+                    self.assertNotEqual(raw_edge_evidence, edge_evidence)
 
 
 
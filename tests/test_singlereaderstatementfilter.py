@@ -4,11 +4,11 @@
 """Tests for `SingleReadingStatementFilter` package."""
 
 import os
-import json
 
 
 import unittest
 from ndexindraloader.indra import SingleReadingStatementFilter
+from tests._fixtures import load_indra_result
 
 
 class TestSingleReadingStatementFilter(unittest.TestCase):
@@ -97,15 +97,14 @@ class TestSingleReadingStatementFilter(unittest.TestCase):
 
     def test_filter_on_ephb(self):
         filter = SingleReadingStatementFilter()
-        with open(TestSingleReadingStatementFilter.EPHB_FORWARDING_INDRA,
-                  'r') as f:
-            indrares = json.load(f)
-        for raw_edge_evidence in indrares['edges']:
-            edge_evidence, report = filter.filter(raw_edge_evidence)
-            if len(report) == 0:
-                self.assertEqual(raw_edge_evidence, edge_evidence)
-            else:
-                self.assertNotEqual(raw_edge_evidence, edge_evidence)
+        indrares = load_indra_result(TestSingleReadingStatementFilter.EPHB_FORWARDING_INDRA)
+        for idx, raw_edge_evidence in enumerate(indrares['edges']):
+            with self.subTest(edge=idx):
+                edge_evidence, report = filter.filter(raw_edge_evidence)
+                if len(report) == 0:
+                    self.assertIs(raw_edge_evidence, edge_evidence)
+                else:
+                    self.assertNotEqual(raw_edge_evidence, edge_evidence)
 
 
 
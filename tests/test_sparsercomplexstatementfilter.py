@@ -4,18 +4,10 @@
 """Tests for `SparserComplexStatementFilter` package."""
 
 import os
-import json
-import tempfile
-import shutil
 
 import unittest
-from unittest.mock import MagicMock
-from ndex2.nice_cx_network import NiceCXNetwork
-import ndex2
-from ndexindraloader.exceptions import NDExIndraLoaderError
-from ndexindraloader.indra import Indra
-from ndexindraloader import indra
 from ndexindraloader.indra import SparserComplexStatementFilter
+from tests._fixtures import load_indra_result
 
 
 class TestSparserComplexStatementFilter(unittest.TestCase):
@@ -93,15 +85,14 @@ class TestSparserComplexStatementFilter(unittest.TestCase):
 
     def test_filter_on_ephb(self):
         filter = SparserComplexStatementFilter()
-        with open(TestSparserComplexStatementFilter.EPHB_FORWARDING_INDRA,
-                  'r') as f:
-            indrares = json.load(f)
-        for raw_edge_evidence in indrares['edges']:
-            edge_evidence, report = filter.filter(raw_edge_evidence)
-            if len(report) == 0:
-                self.assertEqual(raw_edge_evidence, edge_evidence)
-            else:
-                self.assertNotEqual(raw_edge_evidence, edge_evidence)
+        indrares = load_indra_result(TestSparserComplexStatementFilter.EPHB_FORWARDING_INDRA)
+        for idx, raw_edge_evidence in enumerate(indrares['edges']):
+            with self.subTest(edge=idx):
+                edge_evidence, report = filter.filter(raw_edge_evidence)
+                if len(report) == 0:
+                    self.assertIs(raw_edge_evidence, edge_evidence)
+                else:
+                    self.assertNotEqual(raw_edge_evidence, edge_evidence)
 
 
 